@@ -1,7 +1,7 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 import uvicorn
 from dotenv import load_dotenv
 import os
@@ -9,17 +9,49 @@ import os
 # Load environment variables
 load_dotenv()
 
+from app.utils.tracing import TraceMiddleware, configure_logging
+
+# Route every log record through a background thread before anything logs
+configure_logging()
+
+# Import routes
+from app.routes import news_routes
+from app.utils.http_clients import UpstreamClients
+from app.utils.metrics import REGISTRY
+from app.utils.static_files import FingerprintedStaticFiles
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the pooled upstream clients, warm the caches and start pre-warming the busiest
+    regional feeds, then clean up on shutdown
+    """
+    clients = UpstreamClients()
+    news_routes.attach_clients(clients)
+    news_routes.news_service.warm_up()
+    news_routes.prewarm_scheduler.start()
+    try:
+        yield
+    finally:
+        await news_routes.prewarm_scheduler.stop()
+        await news_routes.feed_service.close()
+        news_routes.news_service.close()
+        news_routes.geocoding_service.close()
+        await clients.aclose()
+
 # Initialize FastAPI app
-app = FastAPI(title="LocalNews Summarizer")
+app = FastAPI(title="LocalNews Summarizer", lifespan=lifespan)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Give every request a trace ID for its log records and time it per route
+app.add_middleware(TraceMiddleware)
+
+# Mount static files, served under content-hashed names so browsers can cache them for good
+static_files = FingerprintedStaticFiles(directory="app/static")
+app.mount("/static", static_files, name="static")
 
 # Set up Jinja2 templates
 templates = Jinja2Templates(directory="app/templates")
-
-# Import routes
-from app.routes import news_routes
+templates.env.globals["fingerprint"] = static_files.fingerprint
 
 # Include routers
 app.include_router(news_routes.router)
@@ -33,5 +65,12 @@ async def root(request: Request):
     google_api_key = os.getenv("GOOGLE_API_KEY")
     return templates.TemplateResponse("index.html", {"request": request, "google_api_key": google_api_key})
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Expose stage latencies, LLM usage, cache and upstream counters for Prometheus
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,18 +1,85 @@
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse
+import logging
+import os
+
+from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 
+from app.services.feed_service import FeedService
 from app.services.geocoding_service import GeocodingService
 from app.services.news_service import NewsService
 from app.services.openai_service import OpenAIService
+from app.services.prewarm_service import PrewarmScheduler
+from app.utils.http_responses import cached_json_response, dumps, json_response, parse_fields, project
+from app.utils.metrics import REGISTRY, span
+from app.utils.resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
-# Initialize services
+# Initialize services (shared clients are attached by the app lifespan)
 geocoding_service = GeocodingService()
-news_service = NewsService()
 openai_service = OpenAIService()
+news_service = NewsService(openai_service=openai_service)
+feed_service = FeedService(news_service=news_service, openai_service=openai_service)
+# Started by the app lifespan; learns which regions to pre-warm from the news requests
+prewarm_scheduler = PrewarmScheduler(feed_service)
+# Seconds browsers may reuse a GET /api/news response before revalidating it
+news_cache_max_age = int(os.getenv("NEWS_CACHE_MAX_AGE", "60"))
+
+def attach_clients(clients):
+    """
+    Point every service at the app-wide pooled upstream clients
+
+    Args:
+        clients (UpstreamClients): Clients created once in the FastAPI lifespan
+    """
+    geocoding_service.http_client = clients.geocoding
+    news_service.http_client = clients.newsapi
+    openai_service.openai_client = clients.openai
+
+def collect_metrics():
+    """
+    Report the counters the services already keep, for the ``/metrics`` endpoint
+
+    Yields:
+        tuple: ``(name, kind, documentation, labels, value)`` as expected by ``Registry.register_collector``
+    """
+    caches = {
+        "summary": news_service.summary_cache,
+        "verdict": news_service.verdict_cache,
+        "feed": feed_service.feed_cache,
+        "geocode": geocoding_service.location_cache
+    }
+    for name, cache in caches.items():
+        stats = cache.stats()
+        labels = {"cache": name}
+        yield "cache_hits_total", "counter", "In-memory cache hits", labels, stats["hits"]
+        yield "cache_misses_total", "counter", "In-memory cache misses", labels, stats["misses"]
+        yield "cache_evictions_total", "counter", "Entries evicted to stay within the cache limits", labels, stats["evictions"]
+        yield "cache_entries", "gauge", "Entries currently cached", labels, stats["entries"]
+        yield "cache_bytes", "gauge", "Approximate size of the cached values", labels, stats["bytes"]
+
+    upstreams = {
+        "newsapi": news_service.upstream,
+        "geocoding": geocoding_service.upstream,
+        "openai": openai_service.upstream
+    }
+    for name, upstream in upstreams.items():
+        stats = upstream.stats()
+        labels = {"upstream": name}
+        yield "upstream_retries_total", "counter", "Calls retried after a transient failure", labels, stats["retries"]
+        yield "upstream_rejected_total", "counter", "Calls refused by the circuit breaker or rate limiter", labels, stats["rejected"]
+        yield "upstream_circuit_opened_total", "counter", "Times the circuit breaker opened", labels, stats["times_opened"]
+        for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            yield ("upstream_circuit_state", "gauge", "1 for the current circuit breaker state",
+                   dict(labels, state=state), int(stats["state"] == state))
+
+    yield "feed_builds_in_flight", "gauge", "Feed builds currently running, live and pre-warm", {}, len(feed_service.inflight)
+
+REGISTRY.register_collector(collect_metrics)
 
 class LocationRequest(BaseModel):
     latitude: float
@@ -24,10 +91,11 @@ async def process_location(request: LocationRequest):
     Process user location and return location details
     """
     try:
-        location = await geocoding_service.get_location_from_coordinates(
-            request.latitude, 
-            request.longitude
-        )
+        with span("geocode"):
+            location = await geocoding_service.get_location_from_coordinates(
+                request.latitude, 
+                request.longitude
+            )
         
         if "error" in location:
             return JSONResponse(
@@ -45,56 +113,140 @@ async def get_news(request: Dict[str, Any]):
     Get news articles based on location
     """
     try:
-        print(f"Received news request with data: {request}")
+        logger.debug("Received news request with data: %s", request)
         location = request.get("location", {})
         if not location:
-            print("Error: No location data provided in request")
+            logger.info("No location data provided in request")
             return JSONResponse(
                 status_code=400,
                 content={"error": "Location data is required"}
             )
             
-        print(f"Fetching news for location: {location}")
-        # Get news articles
-        articles = await news_service.get_local_news(location)
+        logger.info("Fetching news for location: %s", location)
+        prewarm_scheduler.record(location)
+        # Get the processed feed (served from the per-region cache when possible)
+        feed = await feed_service.get_feed(location)
         
-        if isinstance(articles, dict) and "error" in articles:
-            print(f"Error from news service: {articles['error']}")
+        if "error" in feed:
             return JSONResponse(
-                status_code=400,
-                content={"error": articles["error"]}
+                status_code=503 if feed.get("unavailable") else 400,
+                content={"error": feed["error"]}
             )
             
-        # Get the search queries that were used
-        search_queries = news_service.get_search_queries()
-        print(f"Search queries used: {search_queries}")
-            
-        # Process and summarize articles
-        processed_articles = []
-        
-        print(f"Processing {len(articles)} articles")
-        for i, article in enumerate(articles):
-            try:
-                print(f"Summarizing article {i+1}/{len(articles)}: {article.get('title', 'No title')}")
-                # Generate summary for each article
-                summary = await openai_service.summarize_article(article)
-                    
-                # Add summary to article
-                article["summary"] = summary
-                processed_articles.append(article)
-            except Exception as article_error:
-                print(f"Error processing article {i+1}: {str(article_error)}")
-                # Add a default summary if there's an error
-                article["summary"] = "Summary unavailable."
-                processed_articles.append(article)
-            
-        print(f"Successfully processed {len(processed_articles)} articles")
-        return {"articles": processed_articles, "location": location, "search_queries": search_queries}
+        response = {"articles": feed["articles"], "location": location, "search_queries": feed["search_queries"]}
+        for extra in ("vetting_stats", "timings"):
+            if extra in feed:
+                response[extra] = feed[extra]
+        with span("serialize"):
+            return json_response(response)
     except Exception as e:
-        print(f"ERROR in /news endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /news endpoint: %s", e)
         return JSONResponse(
             status_code=500,
             content={"error": f"Server error: {str(e)}"}
         )
+
+@router.get("/news")
+async def get_news_cached(
+    request: Request,
+    region: Optional[str] = None,
+    country: Optional[str] = None,
+    country_code: Optional[str] = None,
+    city: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return, e.g. title,summary,url")
+):
+    """
+    Get news articles for a location as a cacheable response
+
+    Returns the articles, location and search queries of ``POST /api/news`` (without
+    the per-build diagnostics, so the body only changes when the news does) with an
+    ETag, answering ``If-None-Match`` with 304 and compressing large bodies. ``fields``
+    trims every article to the listed fields, e.g. to leave out ``content`` and
+    ``ai_analysis``.
+    """
+    location = {
+        name: value.strip() for name, value in
+        (("city", city), ("region", region), ("country", country), ("country_code", country_code))
+        if value and value.strip()
+    }
+    if not location:
+        logger.info("No location data provided in request")
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Location data is required"}
+        )
+
+    try:
+        logger.info("Fetching news for location: %s", location)
+        prewarm_scheduler.record(location)
+        feed = await feed_service.get_feed(location)
+
+        if "error" in feed:
+            return JSONResponse(
+                status_code=503 if feed.get("unavailable") else 400,
+                content={"error": feed["error"]}
+            )
+
+        response = {
+            "articles": project(feed["articles"], parse_fields(fields)),
+            "location": location,
+            "search_queries": feed["search_queries"]
+        }
+        with span("serialize"):
+            return cached_json_response(request, response, max_age=news_cache_max_age)
+    except Exception as e:
+        logger.exception("Error in GET /news endpoint: %s", e)
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Server error: {str(e)}"}
+        )
+
+@router.post("/news/stream")
+async def stream_news(request: Dict[str, Any]):
+    """
+    Stream news articles for a location as newline-delimited JSON
+
+    Frames are sent in feed order: a ``meta`` frame with the location and search
+    queries, one ``article`` frame per article as soon as it is vetted and
+    summarized, then a final ``done`` frame (or an ``error`` frame).
+    """
+    logger.debug("Received news stream request with data: %s", request)
+    location = request.get("location", {})
+    if not location:
+        logger.info("No location data provided in request")
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Location data is required"}
+        )
+
+    prewarm_scheduler.record(location)
+
+    async def frames():
+        article_count = 0
+        try:
+            async for kind, payload in feed_service.stream_feed(location):
+                if kind == "search_queries":
+                    frame = {"type": "meta", "location": location, "search_queries": payload}
+                elif kind == "article":
+                    article_count += 1
+                    frame = {"type": "article", "article": payload}
+                elif kind == "done":
+                    frame = {"type": "done", "article_count": article_count}
+                    for extra in ("vetting_stats", "timings"):
+                        if extra in payload:
+                            frame[extra] = payload[extra]
+                else:
+                    frame = {"type": "error", "error": payload}
+                with span("serialize"):
+                    data = dumps(frame) + b"\n"
+                yield data
+        except Exception as e:
+            logger.exception("Error in /news/stream endpoint: %s", e)
+            yield dumps({"type": "error", "error": f"Server error: {str(e)}"}) + b"\n"
+
+    # Disable proxy buffering so each frame reaches the browser as soon as it is written
+    return StreamingResponse(
+        frames(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,368 @@
+import os
+import logging
+import time
+import asyncio
+from collections import deque
+from dotenv import load_dotenv
+
+from app.services.news_service import NewsService, NewsResult
+from app.services.openai_service import OpenAIService
+from app.utils.lru_cache import LRUCache
+from app.utils.resilience import UpstreamUnavailable
+from app.utils.single_flight import SingleFlight
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class _FeedBroadcast:
+    """
+    Replayable log of the events a feed build publishes
+
+    Every subscriber gets all events from the start, so a stream that joins a build
+    halfway through still sees the search queries and the articles already produced.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, kind, payload):
+        self.events.append((kind, payload))
+        self._notify()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self):
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.closed:
+                return
+            await self._changed.wait()
+
+
+class FeedService:
+    """
+    Service that builds the fully processed news feed for a location
+
+    Finished feeds are cached per (region, country code). A feed younger than
+    ``fresh_ttl`` is served as is; an older one is still served immediately
+    while a single background task rebuilds it (stale-while-revalidate).
+    Concurrent requests for a feed that is not cached share one pipeline run,
+    whether they wait for the whole feed or stream it article by article.
+    While NewsAPI is unavailable, the last good feed (up to ``fallback_ttl`` old) is
+    served instead, or failing that one assembled from the local article store, and
+    articles OpenAI cannot summarize get an extractive summary.
+    """
+
+    def __init__(self, news_service=None, openai_service=None):
+        self.openai_service = openai_service or OpenAIService()
+        self.news_service = news_service or NewsService(openai_service=self.openai_service)
+        # Seconds a feed is served without triggering a refresh
+        self.fresh_ttl = float(os.getenv("FEED_FRESH_TTL", "300"))
+        # Stale feeds older than this are rebuilt in the foreground
+        self.max_stale = float(os.getenv("FEED_MAX_STALE", "3600"))
+        # Older feeds are kept this long to be served when a rebuild cannot reach NewsAPI
+        self.fallback_ttl = float(os.getenv("FEED_FALLBACK_TTL", "86400"))
+        self.feed_cache = LRUCache(
+            max_entries=int(os.getenv("FEED_CACHE_SIZE", "500")),
+            ttl=max(self.max_stale, self.fallback_ttl)
+        )
+        # Background refresh tasks by feed key, at most one per key
+        self.refreshing = {}
+        # Identical concurrent builds (foreground or background) share one run
+        self.inflight = SingleFlight()
+        # Event log of the most recent build per feed key, for streaming subscribers
+        self.broadcasts = {}
+
+    def _servable_entry(self, key, location):
+        """
+        Return the cache entry to serve for a feed key, scheduling a refresh if it is stale
+
+        Returns:
+            dict: ``feed`` and ``built_at``, or None if the feed has to be built in the foreground
+        """
+        entry = self.feed_cache.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry["built_at"]
+        if age > self.max_stale:
+            # Only kept as a fallback for when NewsAPI is unavailable
+            return None
+        if age > self.fresh_ttl:
+            self._schedule_refresh(key, location)
+        return entry
+
+    def feed_key(self, location):
+        """
+        Build the cache key for a location; only the fields the NewsAPI query uses matter
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+
+        Returns:
+            tuple: Normalized (region or country, country code)
+        """
+        area = location.get("region") or location.get("country") or ""
+        country_code = location.get("country_code") or ""
+        return (" ".join(area.split()).casefold(), country_code.strip().upper())
+
+    async def get_feed(self, location):
+        """
+        Return the processed feed for a location, from the cache when possible
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+
+        Returns:
+            dict: ``articles`` and ``search_queries``, or ``error``
+        """
+        key = self.feed_key(location)
+        entry = self._servable_entry(key, location)
+        if entry is not None:
+            return entry["feed"]
+
+        return await self.inflight.do(key, lambda: self._start_build(key, location))
+
+    async def warm(self, location, force=False):
+        """
+        Build and cache the feed for a location ahead of demand
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+            force (bool): Rebuild even if the cached feed is still fresh
+
+        Returns:
+            bool: True if a build ran (or was joined), False if the cached feed was fresh
+        """
+        key = self.feed_key(location)
+        entry = self.feed_cache.get(key)
+        if entry is not None and not force and time.monotonic() - entry["built_at"] <= self.fresh_ttl:
+            return False
+        # Live requests for the same feed join this build instead of starting their own
+        await self.inflight.do(key, lambda: self._start_build(key, location))
+        return True
+
+    async def stream_feed(self, location):
+        """
+        Yield the processed feed for a location event by event
+
+        A cached feed is replayed at once. Otherwise the caller subscribes to the shared
+        build for the location (starting it if needed) and receives each article as soon
+        as it has been vetted and summarized.
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+
+        Yields:
+            tuple: ``("search_queries", dict)``, then ``("article", dict)`` per article, then
+                ``("done", feed)`` or ``("error", message)``
+        """
+        key = self.feed_key(location)
+        entry = self._servable_entry(key, location)
+        if entry is not None:
+            feed = entry["feed"]
+            yield "search_queries", feed["search_queries"]
+            for article in feed["articles"]:
+                yield "article", article
+            yield "done", feed
+            return
+
+        task = self.inflight.start(key, lambda: self._start_build(key, location))
+        broadcast = self.broadcasts.get(key)
+        if broadcast is not None:
+            # Also close the log if the build is cancelled before it ever runs
+            task.add_done_callback(lambda _: broadcast.close())
+            async for event in broadcast.subscribe():
+                yield event
+        else:
+            # The build finished a moment ago and only its result is left to replay
+            await asyncio.wait([task])
+            if not task.cancelled() and task.exception() is None and "error" not in task.result():
+                yield "search_queries", task.result()["search_queries"]
+                for article in task.result()["articles"]:
+                    yield "article", article
+
+        if task.cancelled():
+            yield "error", "Feed build was cancelled"
+        elif task.exception() is not None:
+            yield "error", str(task.exception())
+        elif "error" in task.result():
+            yield "error", task.result()["error"]
+        else:
+            yield "done", task.result()
+
+    def _start_build(self, key, location):
+        """Open a fresh event log for a new shared build and return the build coroutine"""
+        broadcast = _FeedBroadcast()
+        self.broadcasts[key] = broadcast
+        return self._build_and_store(key, location, broadcast)
+
+    async def _build_and_store(self, key, location, broadcast):
+        """Build a feed and cache it; runs once per key no matter how many requests wait on it"""
+        try:
+            try:
+                feed = await self._build_feed(location, broadcast.publish)
+            except UpstreamUnavailable as e:
+                feed = await self._fallback_feed(key, location, str(e))
+                # Nothing was published before NewsAPI failed, so stream the fallback instead
+                if "error" not in feed:
+                    broadcast.publish("search_queries", feed["search_queries"])
+                    for article in feed["articles"]:
+                        broadcast.publish("article", article)
+                return feed
+            self._store_feed(key, feed)
+            return feed
+        finally:
+            broadcast.close()
+            if self.broadcasts.get(key) is broadcast:
+                del self.broadcasts[key]
+
+    async def _fallback_feed(self, key, location, reason):
+        """
+        Return the last good feed for a key, marked as stale, or one assembled from the
+        article store if there is none (``used_endpoint`` is then ``article_store``)
+
+        Args:
+            key (tuple): The feed key
+            location (dict): Location information containing city, region, country, etc.
+            reason (str): Why a fresh feed could not be built
+
+        Returns:
+            dict: The cached feed with ``search_queries["stale"]`` set, or ``error`` and ``unavailable``
+        """
+        entry = self.feed_cache.get(key)
+        if entry is None:
+            articles = await self.news_service.search_stored(location)
+            if not articles:
+                logger.warning("News unavailable for %s and no earlier feed to fall back on: %s", key, reason)
+                return {"error": "News is temporarily unavailable, please try again shortly", "unavailable": True}
+            logger.warning("News unavailable for %s, serving %s articles from the article store: %s", key, len(articles), reason)
+            for article in articles:
+                if article.get("ai_summary"):
+                    article["summary"] = article["ai_summary"]
+                else:
+                    article.update(self.openai_service.extractive_summary(article))
+            return {
+                "articles": articles,
+                "search_queries": {"used_endpoint": "article_store", "stale": True}
+            }
+        logger.warning("News unavailable for %s, serving the feed from %.0fs ago: %s", key, time.monotonic() - entry['built_at'], reason)
+        feed = dict(entry["feed"])
+        feed["search_queries"] = dict(feed["search_queries"], stale=True)
+        return feed
+
+    def _store_feed(self, key, feed):
+        """Cache a feed unless it is an error or fallback data"""
+        search_queries = feed.get("search_queries", {})
+        if "error" in feed or search_queries.get("stale") or search_queries.get("used_endpoint") not in ("top-headlines", "everything"):
+            return
+        self.feed_cache.put(key, {"feed": feed, "built_at": time.monotonic()})
+
+    def _schedule_refresh(self, key, location):
+        """Start a background rebuild of a stale feed unless one is already running"""
+        if key in self.refreshing or self.inflight.in_flight(key):
+            return
+        task = asyncio.create_task(self._refresh(key, dict(location)))
+        self.refreshing[key] = task
+        task.add_done_callback(lambda _: self.refreshing.pop(key, None))
+
+    async def _refresh(self, key, location):
+        try:
+            logger.info("Refreshing stale feed for %s", key)
+            await self.inflight.do(key, lambda: self._start_build(key, location))
+        except Exception as e:
+            # Keep serving the stale feed; the next request past the TTL tries again
+            logger.warning("Error refreshing feed for %s: %s", key, e)
+
+    async def _build_feed(self, location, publish=None):
+        """
+        Fetch, vet and summarize the news for a location
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+            publish (callable): Optional ``publish(kind, payload)`` called with the search
+                queries and then with each finished article, in feed order
+
+        Returns:
+            dict: ``articles``, ``search_queries``, ``vetting_stats`` and ``timings`` (those of
+                ``NewsResult`` plus ``build``, the seconds until every article was summarized)
+        """
+        async def summarize(article):
+            try:
+                logger.debug("Summarizing article: %s", article.get('title', 'No title'))
+                return await self.openai_service.summarize(article)
+            except Exception as article_error:
+                logger.warning("Error summarizing article: %s", article_error)
+                return self.openai_service.extractive_summary(article)
+
+        started = time.monotonic()
+        # Everything this build produced; nothing request-specific is kept on the services
+        result = NewsResult()
+        # Articles in feed order, each with its standalone summary task (None when the
+        # summary written during vetting can be reused)
+        queue = deque()
+
+        def finish_ready():
+            while queue and (queue[0][1] is None or queue[0][1].done()):
+                article, task = queue.popleft()
+                if task is not None:
+                    article.update(task.result())
+                else:
+                    article["summary"] = article["ai_summary"]
+                result.articles.append(article)
+                if publish is not None:
+                    publish("article", article)
+
+        try:
+            async for kind, item in self.news_service.stream_local_news(location):
+                if kind == "search_queries":
+                    logger.debug("Search queries used: %s", item)
+                    if publish is not None:
+                        publish("search_queries", item)
+                if kind != "article":
+                    setattr(result, kind, item)
+                    continue
+                # Only articles that never went through vetting need a standalone summary call
+                task = None if item.get("ai_summary") else asyncio.create_task(summarize(item))
+                queue.append((item, task))
+                finish_ready()
+
+            while queue:
+                if queue[0][1] is not None:
+                    await asyncio.wait([queue[0][1]])
+                finish_ready()
+        finally:
+            leftover = [task for _, task in queue if task is not None and not task.done()]
+            for task in leftover:
+                task.cancel()
+            await asyncio.gather(*leftover, return_exceptions=True)
+
+        logger.info("Successfully processed %s articles", len(result.articles))
+        return {
+            "articles": result.articles,
+            "search_queries": result.search_queries,
+            "vetting_stats": result.vetting_stats,
+            "timings": dict(result.timings, build=round(time.monotonic() - started, 3))
+        }
+
+    async def close(self):
+        """Cancel background refreshes and shared builds that are still running"""
+        tasks = list(self.refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.inflight.cancel_all()
@@ -1,18 +1,161 @@
 import os
-import requests
+import logging
+import asyncio
 from dotenv import load_dotenv
 
+from app.utils.cache_utils import GeocodeCache
+from app.utils.http_clients import create_http_client, create_upstream_policy
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import span
+from app.utils.offline_geocoder import OfflineGeocoder
+from app.utils.single_flight import SingleFlight
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
 class GeocodingService:
     """Service for interacting with Google Maps Geocoding API"""
     
-    def __init__(self):
+    def __init__(self, http_client=None, location_store=None, upstream=None):
         self.api_key = os.getenv("GOOGLE_API_KEY")
-        self.base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        self.base_url = os.getenv("GEOCODING_BASE_URL", "https://maps.googleapis.com/maps/api/geocode/json")
+        # Shared pooled client, normally attached by the app lifespan
+        self.http_client = http_client
+        # Rate limit, retries and circuit breaker for Google requests
+        self.upstream = upstream or create_upstream_policy("GEOCODING", rate_limit=40, burst=50)
+        # Coordinates are snapped to a grid of this many degrees (0.01 is roughly 1 km)
+        self.grid_degrees = float(os.getenv("GEOCODE_GRID_DEGREES", "0.01"))
+        # Results per grid cell, in memory and in a store shared by every worker process
+        self.location_cache = LRUCache(
+            max_entries=int(os.getenv("GEOCODE_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 86400)))
+        )
+        self.location_store = location_store if location_store is not None else self._open_location_store()
+        # Concurrent lookups for the same cell share one Google request
+        self.inflight = SingleFlight()
+        # In "offline" mode the bundled gazetteer answers first and Google is only a fallback
+        self.mode = os.getenv("GEOCODER_MODE", "google").lower()
+        self.offline_max_km = float(os.getenv("OFFLINE_GEOCODER_MAX_KM", "50"))
+        self.offline_geocoder = self._open_offline_geocoder() if self.mode == "offline" else None
+        # In "google" mode the gazetteer is only loaded once Google fails
+        self._fallback_loaded = self.mode == "offline"
+
+    @staticmethod
+    def _open_offline_geocoder():
+        """Load the bundled gazetteer, or return None so Google is used for every lookup"""
+        try:
+            return OfflineGeocoder()
+        except Exception as e:
+            logger.warning("Offline geocoder unavailable, using Google only: %s", e)
+            return None
+
+    @staticmethod
+    def _open_location_store():
+        """Open the shared geocode store, or return None if it cannot be opened"""
+        try:
+            return GeocodeCache()
+        except Exception as e:
+            logger.warning("GeocodeCache unavailable, using in-memory cache only: %s", e)
+            return None
+
+    def _fallback_geocoder(self):
+        """Return the offline geocoder, loading it on first use when Google fails"""
+        if not self._fallback_loaded:
+            self._fallback_loaded = True
+            self.offline_geocoder = self._open_offline_geocoder()
+        return self.offline_geocoder
+
+    def close(self):
+        """Flush pending writes and close the persistent store"""
+        if self.location_store is not None:
+            self.location_store.close()
+
+    @property
+    def client(self):
+        """Return the shared HTTP client, creating a private one if none was attached"""
+        if self.http_client is None:
+            self.http_client = create_http_client("GEOCODING")
+        return self.http_client
+        
+    def _quantize(self, latitude, longitude):
+        """
+        Snap coordinates to the center of their grid cell
         
+        Args:
+            latitude (float): The latitude coordinate
+            longitude (float): The longitude coordinate
+            
+        Returns:
+            tuple: The cell key and the cell center as (key, latitude, longitude)
+        """
+        row = round(latitude / self.grid_degrees)
+        col = round(longitude / self.grid_degrees)
+        key = f"{self.grid_degrees}:{row}:{col}"
+        return key, round(row * self.grid_degrees, 6), round(col * self.grid_degrees, 6)
+
+    async def _get_cached_location(self, cell):
+        """Return the cached location for a grid cell, or None; the SQLite store is read off the event loop"""
+        location = self.location_cache.get(cell)
+        if location is None and self.location_store is not None:
+            location = await asyncio.to_thread(self.location_store.get_cached_location, cell)
+            if location is not None:
+                self.location_cache.put(cell, location)
+        return location
+
+    async def _cache_location(self, cell, location):
+        """Cache a successful lookup for a grid cell"""
+        self.location_cache.put(cell, location)
+        if self.location_store is not None:
+            await asyncio.to_thread(self.location_store.cache_location, cell, location)
+
     async def get_location_from_coordinates(self, latitude, longitude):
+        """
+        Convert coordinates to a location name, using the offline gazetteer when enabled and
+        serving repeat Google lookups in the same grid cell from the cache. If Google
+        fails (or its circuit is open) the nearest gazetteer city is used instead.
+        
+        Args:
+            latitude (float): The latitude coordinate
+            longitude (float): The longitude coordinate
+            
+        Returns:
+            dict: Location information including city, region, country
+        """
+        if self.offline_geocoder is not None:
+            location, distance_km = self.offline_geocoder.reverse(latitude, longitude)
+            if location is not None and distance_km <= self.offline_max_km:
+                return location
+            
+        cell, cell_latitude, cell_longitude = self._quantize(latitude, longitude)
+        location = await self._get_cached_location(cell)
+        if location is None:
+            location = await self.inflight.do(
+                cell, lambda: self._lookup_cell(cell, cell_latitude, cell_longitude)
+            )
+        if "error" in location:
+            fallback = self._fallback_geocoder()
+            if fallback is not None:
+                nearest, distance_km = fallback.reverse(latitude, longitude)
+                if nearest is not None and distance_km <= self.offline_max_km:
+                    logger.warning("Google geocoding failed (%s), using nearest gazetteer city", location['error'])
+                    return nearest
+        # Hand out a copy so callers cannot modify the cached entry
+        return dict(location)
+
+    async def _lookup_cell(self, cell, latitude, longitude):
+        """Look up a grid cell with Google and cache the result if it succeeded"""
+        # A lookup that finished while this one was being scheduled may have filled the cache
+        location = await self._get_cached_location(cell)
+        if location is None:
+            location = await self._fetch_location(latitude, longitude)
+            if "error" not in location:
+                await self._cache_location(cell, location)
+        return location
+
+    async def _fetch_location(self, latitude, longitude):
         """
         Convert coordinates to a location name using Google's Geocoding API
         
@@ -30,7 +173,8 @@ class GeocodingService:
                 "result_type": "locality|administrative_area_level_1|country"
             }
             
-            response = requests.get(self.base_url, params=params)
+            with span("geocode_google"):
+                response = await self.upstream.call(lambda: self.client.get(self.base_url, params=params))
             response.raise_for_status()
             
             data = response.json()
@@ -1,31 +1,154 @@
 import os
-import requests
+import logging
+import time
+import asyncio
 import datetime
-import json
 import hashlib
-from openai import OpenAI
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
+from app.services.openai_service import OpenAIService
+from app.utils.article_store import ArticleStore
+from app.utils.cache_utils import SummaryCache, VerdictCache
+from app.utils.extractive_summarizer import SOURCE_EXTRACTIVE, SOURCE_LLM
+from app.utils.http_clients import create_http_client, create_upstream_policy
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import span
+from app.utils.prompt_builder import PROMPT_VERSION
+from app.utils.near_duplicates import NearDuplicateIndex, article_text
+from app.utils.relevance_prefilter import RelevancePrefilter, RELEVANT, IRRELEVANT, UNCERTAIN
+from app.utils.resilience import UpstreamUnavailable
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NewsResult:
+    """
+    Everything one ``get_local_news`` call produced
+
+    Attributes:
+        articles (list): Articles relevant to the location, in feed order
+        search_queries (dict): Query parameters sent to NewsAPI and the endpoint used
+        vetting_stats (dict): Pre-filter and LLM call counters from the vetting stage
+        timings (dict): Seconds spent fetching (``fetch``), until the first article
+            (``first_article``) and in total (``total``)
+    """
+    articles: list = field(default_factory=list)
+    search_queries: dict = field(default_factory=dict)
+    vetting_stats: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def used_endpoint(self):
+        """The NewsAPI endpoint the articles came from"""
+        return self.search_queries.get("used_endpoint")
+
+
 class NewsService:
     """
     Service for fetching news articles from NewsAPI.org
     """
     
-    def __init__(self):
+    def __init__(self, http_client=None, openai_service=None, summary_store=None, verdict_store=None,
+                 upstream=None, article_store=None):
         self.api_key = os.getenv("NEWSAPI_KEY")
-        self.base_url = "https://newsapi.org/v2"
-        # Flag to indicate if we should use mock data
-        self.use_mock = False
-        # Track search queries
-        self.last_search_queries = {}
-        # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        # Initialize summary cache
-        self.summary_cache = {}
+        self.base_url = os.getenv("NEWSAPI_BASE_URL", "https://newsapi.org/v2").rstrip("/")
+        # Shared pooled client, normally attached by the app lifespan
+        self.http_client = http_client
+        # Rate limit, retries and circuit breaker for NewsAPI requests
+        self.upstream = upstream or create_upstream_policy("NEWSAPI", rate_limit=5, burst=10)
+        # All LLM calls go through the OpenAI service
+        self.openai_service = openai_service or OpenAIService()
+        # Persistent summary store shared by every worker process, fronted by an in-memory cache
+        self.summary_store = summary_store if summary_store is not None else self._open_store(SummaryCache)
+        self.summary_cache = LRUCache(
+            max_entries=int(os.getenv("SUMMARY_CACHE_SIZE", "1000")),
+            max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+            ttl=float(os.getenv("SUMMARY_CACHE_TTL", "86400"))
+        )
+        # Relevance verdicts keyed by article hash, normalized region and prompt version,
+        # persisted next to the summaries
+        self.verdict_store = verdict_store if verdict_store is not None else self._open_store(VerdictCache)
+        self.verdict_cache = LRUCache(
+            max_entries=int(os.getenv("VERDICT_CACHE_SIZE", "5000")),
+            max_bytes=int(os.getenv("VERDICT_CACHE_MAX_BYTES", str(4 * 1024 * 1024))),
+            ttl=float(os.getenv("VERDICT_CACHE_TTL", "86400"))
+        )
+        # Articles, summaries and per-region verdicts of earlier builds, so a rebuild only
+        # vets articles it has not seen, and a feed can be served locally while NewsAPI is down
+        self.article_store = article_store if article_store is not None else self._open_store(ArticleStore)
+        # Candidate pool for vetting: further result pages are only fetched while the
+        # vetter still needs relevant articles
+        self.max_pages = max(1, int(os.getenv("NEWSAPI_MAX_PAGES", "3")))
+        self.candidate_limit = max(1, int(os.getenv("NEWS_CANDIDATE_LIMIT", "40")))
+        # Shingle similarity above which two articles are treated as the same story
+        self.duplicate_threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.5"))
+        # Seconds to wait for top-headlines before also querying the everything endpoint
+        self.hedge_delay = float(os.getenv("NEWSAPI_HEDGE_DELAY", "0.3"))
+        # Local keyword check that settles clear-cut verdicts without the LLM
+        self.prefilter = self._open_prefilter() if os.getenv("RELEVANCE_PREFILTER", "1") != "0" else None
+        # Stored verdicts come from the LLM or the pre-filter, so they are dropped when either changes
+        self.verdict_version = f"{PROMPT_VERSION}-{self.prefilter.version if self.prefilter is not None else 'llm'}"
+        # Maximum number of articles vetted by the LLM at the same time
+        self.vetting_concurrency = max(1, int(os.getenv("VETTING_CONCURRENCY", "5")))
+
+    @staticmethod
+    def _open_store(store_class):
+        """Open a shared persistent store, or return None if it cannot be opened"""
+        try:
+            return store_class()
+        except Exception as e:
+            logger.warning("%s unavailable, using in-memory cache only: %s", store_class.__name__, e)
+            return None
+
+    @staticmethod
+    def _open_prefilter():
+        """Load the relevance pre-filter, or return None if its data files cannot be read"""
+        try:
+            return RelevancePrefilter()
+        except Exception as e:
+            logger.warning("Relevance pre-filter unavailable, vetting every article with the LLM: %s", e)
+            return None
+
+    def warm_up(self):
+        """
+        Load the most recent summaries and verdicts from the persistent stores into memory
         
+        Returns:
+            int: Number of entries loaded
+        """
+        loaded = 0
+        if self.article_store is not None:
+            self.article_store.compact()
+        for store, cache in ((self.summary_store, self.summary_cache), (self.verdict_store, self.verdict_cache)):
+            if store is None:
+                continue
+            store.compact()
+            entries = store.load_recent(cache.max_entries)
+            # Oldest first so the newest entries end up as the most recently used
+            for key, value in reversed(entries):
+                cache.put(key, value)
+            loaded += len(entries)
+        logger.info("Warmed summary and verdict caches with %s entries", loaded)
+        return loaded
+
+    def close(self):
+        """Flush pending writes and close the persistent stores"""
+        for store in (self.summary_store, self.verdict_store, self.article_store):
+            if store is not None:
+                store.close()
+
+    @property
+    def client(self):
+        """Return the shared NewsAPI HTTP client, creating a private one if none was attached"""
+        if self.http_client is None:
+            self.http_client = create_http_client("NEWSAPI")
+        return self.http_client
+
     async def get_local_news(self, location):
         """
         Fetch local news based on location information and ensure articles are relevant to the location
@@ -34,174 +157,314 @@ class NewsService:
             location (dict): Location information containing city, region, country, etc.
             
         Returns:
-            list: List of news articles relevant to the location
+            NewsResult: The articles relevant to the location with the queries, vetting stats and
+                timings of this call
         """
-        # If we're in mock mode, return mock data
-        if self.use_mock:
-            print("Using mock news data")
-            # Import mock_news only when needed to avoid circular imports
-            from app.utils import mock_news
-            return mock_news.get_mock_news(location)
+        result = NewsResult()
+        async for kind, item in self.stream_local_news(location):
+            if kind == "article":
+                result.articles.append(item)
+            else:
+                setattr(result, kind, item)
+        return result
+
+    async def stream_local_news(self, location):
+        """
+        Fetch local news for a location and yield each article as soon as its place in the feed is known
+        
+        The articles come out in the same order ``get_local_news`` returns them, but a
+        relevant article is yielded as soon as it and every article before it have been
+        vetted instead of after the whole batch. All state of the call lives in the
+        generator, so any number of calls can run at once.
+        
+        Args:
+            location (dict): Location information containing city, region, country, etc.
             
-        try:
-            print(f"News service received location: {location}")
+        Yields:
+            tuple: ``("search_queries", dict)`` once, then ``("article", dict)`` per article, then
+                ``("vetting_stats", dict)`` and ``("timings", dict)`` as described on ``NewsResult``
+        
+        Raises:
+            UpstreamUnavailable: If NewsAPI could not be reached, before anything is yielded
+        """
+        started = time.monotonic()
+        timings = {}
+        articles, search_queries, pagination = await self._fetch_articles(location)
+        timings["fetch"] = round(time.monotonic() - started, 3)
+        yield "search_queries", search_queries
+        
+        candidates = self._iter_candidates(articles, pagination)
+        vetting_stats = self._new_vetting_stats()
+        async for article in self._iter_processed_articles(candidates, location, vetting_stats):
+            timings.setdefault("first_article", round(time.monotonic() - started, 3))
+            yield "article", article
+        yield "vetting_stats", vetting_stats
+        timings["total"] = round(time.monotonic() - started, 3)
+        yield "timings", timings
+
+    async def _fetch_articles(self, location):
+        """
+        Query NewsAPI for a location
+        
+        Args:
+            location (dict): Location information containing city, region, country, etc.
             
-            # Determine the best query parameter based on available location info
-            headlines_params = {}
-            everything_params = {}
+        Returns:
+            tuple: ``(articles, search_queries, pagination)``; the raw NewsAPI articles still need
+                to be processed and vetted. ``pagination`` describes how to request further pages,
+                or is None
+        
+        Raises:
+            UpstreamUnavailable: If every endpoint failed (as opposed to finding nothing)
+        """
+        logger.info("News service received location: %s", location)
+        
+        # Determine the best query parameter based on available location info
+        headlines_params = {}
+        everything_params = {}
+        
+        # Set up query for both endpoints - prioritize region/state over city
+        if location.get("region"):
+            headlines_params["q"] = location["region"]
+            everything_params["q"] = location["region"]
+            logger.debug("Using region for query: %s", location['region'])
+        elif location.get("country"):
+            headlines_params["q"] = location["country"]
+            everything_params["q"] = location["country"]
+            logger.debug("Using country for query: %s", location['country'])
+        else:
+            # Default query
+            headlines_params["q"] = "news"
+            everything_params["q"] = "news"
+            logger.debug("No location data available, using default query 'news'")
             
-            # Set up query for both endpoints - prioritize region/state over city
-            if location.get("region"):
-                headlines_params["q"] = location["region"]
-                everything_params["q"] = location["region"]
-                print(f"Using region for query: {location['region']}")
-            elif location.get("country"):
-                headlines_params["q"] = location["country"]
-                everything_params["q"] = location["country"]
-                print(f"Using country for query: {location['country']}")
-            else:
-                # Default query
-                headlines_params["q"] = "news"
-                everything_params["q"] = "news"
-                print("No location data available, using default query 'news'")
-                
-            # Store city information for reference, even though we're not using it as the primary query
-            if location.get("city"):
-                print(f"Note: City information available ({location['city']}) but using region/country instead")
-                
-            # Country code is only valid for top-headlines
-            if location.get("country_code"):
-                country_code = location["country_code"].lower()
-                if len(country_code) == 2:
-                    headlines_params["country"] = country_code
-                    print(f"Using country code for headlines: {country_code}")
+        # Store city information for reference, even though we're not using it as the primary query
+        if location.get("city"):
+            logger.debug("Note: City information available (%s) but using region/country instead", location['city'])
             
-            # Add common parameters
-            headlines_params["apiKey"] = self.api_key
-            headlines_params["pageSize"] = 16
+        # Country code is only valid for top-headlines
+        if location.get("country_code"):
+            country_code = location["country_code"].lower()
+            if len(country_code) == 2:
+                headlines_params["country"] = country_code
+                logger.debug("Using country code for headlines: %s", country_code)
+        
+        # Add common parameters
+        headlines_params["apiKey"] = self.api_key
+        headlines_params["pageSize"] = 16
+        
+        everything_params["apiKey"] = self.api_key
+        everything_params["pageSize"] = 16
+        everything_params["language"] = "en"
+        everything_params["sortBy"] = "publishedAt"
+        
+        # Add date parameter (required for some API plans)
+        today = datetime.datetime.now()
+        month_ago = today - datetime.timedelta(days=30)
+        everything_params["from"] = month_ago.strftime("%Y-%m-%d")
+        
+        # Top-headlines is preferred (more relevant but limited coverage). Everything is
+        # started as a hedge once top-headlines has not produced enough articles within
+        # the hedge delay, so the fallback rarely costs a second serial round trip.
+        logger.debug("Trying top-headlines with params: %s", headlines_params)
+        headlines_task = asyncio.create_task(self._fetch_endpoint("top-headlines", headlines_params))
+        everything_task = None
+        try:
+            await asyncio.wait([headlines_task], timeout=self.hedge_delay)
+            # Count distinct URLs, as the fallback decision below does
+            if not headlines_task.done() or len(self._merge_articles(headlines_task.result() or [])) < 10:
+                logger.debug("Trying everything endpoint with params: %s", everything_params)
+                everything_task = asyncio.create_task(self._fetch_endpoint("everything", everything_params))
             
-            everything_params["apiKey"] = self.api_key
-            everything_params["pageSize"] = 16
-            everything_params["language"] = "en"
-            everything_params["sortBy"] = "publishedAt"
+            raw_headlines = await headlines_task
+            headline_articles = self._merge_articles(raw_headlines or [])
+            article_count = len(headline_articles)
             
-            # Add date parameter (required for some API plans)
-            today = datetime.datetime.now()
-            month_ago = today - datetime.timedelta(days=30)
-            everything_params["from"] = month_ago.strftime("%Y-%m-%d")
+            # Check if we have at least 10 articles
+            if article_count >= 10:
+                # Store the search queries used
+                search_queries = {
+                    "headlines_query": headlines_params.get("q", "N/A"),
+                    "country_code": headlines_params.get("country", "N/A"),
+                    "used_endpoint": "top-headlines",
+                    "article_count": article_count
+                }
+                pagination = {"endpoint": "top-headlines", "params": headlines_params, "page_size": len(raw_headlines)}
+                return headline_articles, search_queries, pagination
+            logger.info("Top-headlines returned only %s articles, which is less than 10. Falling back to everything endpoint.", article_count)
             
-            # Try top-headlines first (more relevant but limited coverage)
-            print(f"Trying top-headlines with params: {headlines_params}")
-            try:
-                headlines_response = requests.get(f"{self.base_url}/top-headlines", params=headlines_params)
-                print(f"Top-headlines response status: {headlines_response.status_code}")
-                
-                if headlines_response.status_code == 200:
-                    data = headlines_response.json()
-                    articles = data.get("articles", [])
-                    article_count = len(articles)
-                    print(f"Found {article_count} headline articles")
-                    
-                    # Check if we have at least 10 articles
-                    if article_count >= 10:
-                        processed_articles = self._process_articles(articles, location)
-                        # Store the search queries used
-                        self.last_search_queries = {
-                            "headlines_query": headlines_params.get("q", "N/A"),
-                            "country_code": headlines_params.get("country", "N/A"),
-                            "used_endpoint": "top-headlines",
-                            "article_count": article_count
-                        }
-                        return processed_articles
-                    else:
-                        print(f"Top-headlines returned only {article_count} articles, which is less than 10. Falling back to everything endpoint.")
-                        # Continue to everything endpoint
-            except Exception as headline_error:
-                print(f"Error with headlines endpoint: {str(headline_error)}")
+            if everything_task is None:
+                everything_task = asyncio.create_task(self._fetch_endpoint("everything", everything_params))
+            everything_articles = await everything_task
+        finally:
+            # Cancel whichever request is no longer needed
+            for task in (headlines_task, everything_task):
+                if task is not None and not task.done():
+                    task.cancel()
+        
+        if raw_headlines is None and everything_articles is None:
+            raise UpstreamUnavailable("NewsAPI requests failed for both endpoints")
+        
+        # Keep the few headlines ahead of the broader everything results
+        articles = self._merge_articles(headline_articles, everything_articles or [])
+        # Store the search queries used
+        search_queries = {
+            "everything_query": everything_params.get("q", "N/A"),
+            "language": everything_params.get("language", "N/A"),
+            "from_date": everything_params.get("from", "N/A"),
+            "used_endpoint": "everything",
+            "merged_headlines": article_count
+        }
+        pagination = None
+        if everything_articles:
+            pagination = {"endpoint": "everything", "params": everything_params, "page_size": len(everything_articles)}
+        return articles, search_queries, pagination
+
+    async def _iter_candidates(self, articles, pagination=None):
+        """
+        Yield normalized candidate articles, fetching further NewsAPI pages only when they are consumed
+        
+        Repeats of a URL are skipped and near-duplicates (the same wire story from several
+        outlets) are folded into the first article of their cluster, which lists the others
+        under ``alternate_sources``; only that representative is vetted and summarized.
+        Once the first page is used up, the next page of the same query is requested, up to
+        ``max_pages`` pages and ``candidate_limit`` articles in total.
+        
+        Args:
+            articles (list): Raw articles from the first page
+            pagination (dict): ``endpoint``, ``params`` and ``page_size`` of the first page, or None
             
-            # If headlines didn't work or returned no results, try everything endpoint
-            print(f"Trying everything endpoint with params: {everything_params}")
-            try:
-                everything_response = requests.get(f"{self.base_url}/everything", params=everything_params)
-                print(f"Everything response status: {everything_response.status_code}")
-                
-                if everything_response.status_code == 200:
-                    data = everything_response.json()
-                    if data.get("totalResults", 0) > 0:
-                        print(f"Found {len(data.get('articles', []))} articles from everything endpoint")
-                        articles = self._process_articles(data.get("articles", []), location)
-                        # Store the search queries used
-                        self.last_search_queries = {
-                            "everything_query": everything_params.get("q", "N/A"),
-                            "language": everything_params.get("language", "N/A"),
-                            "from_date": everything_params.get("from", "N/A"),
-                            "used_endpoint": "everything"
-                        }
-                        return articles
+        Yields:
+            dict: Normalized articles
+        """
+        seen_urls = set()
+        clusters = NearDuplicateIndex(threshold=self.duplicate_threshold)
+        yielded = 0
+        page = 1
+        page_size = pagination["page_size"] if pagination else 0
+        while True:
+            # Cluster the whole page first so a story's alternates are attached before it is used
+            representatives = []
+            merged = 0
+            with span("dedup"):
+                for article in articles:
+                    url = article.get("url")
+                    if url:
+                        if url in seen_urls:
+                            continue
+                        seen_urls.add(url)
+                    candidate = self._normalize_article(article)
+                    representative = clusters.find_or_add(article_text(candidate), candidate)
+                    if representative is None:
+                        representatives.append(candidate)
                     else:
-                        print("No articles found in everything endpoint")
-                else:
-                    error_data = everything_response.json() if everything_response.content else {"message": "Unknown error"}
-                    print(f"Everything endpoint error: {everything_response.status_code} - {error_data}")
-            except Exception as everything_error:
-                print(f"Error with everything endpoint: {str(everything_error)}")
+                        merged += 1
+                        representative.setdefault("alternate_sources", []).append({
+                            "source": candidate["source"],
+                            "title": candidate["title"],
+                            "url": candidate["url"]
+                        })
+            if merged:
+                logger.debug("Merged %s near-duplicate articles on page %s", merged, page)
             
-            # If we got here, both endpoints failed or returned no results
-            # Enable mock mode for future requests and return mock data this time
-            print("API requests failed or returned no results. Switching to mock data.")
-            self.use_mock = True
-            # Import mock_news only when needed to avoid circular imports
-            from app.utils import mock_news
-            mock_data = mock_news.get_mock_news(location)
-            self.last_search_queries = {
-                "headlines_query": headlines_params.get("q", "N/A"),
-                "everything_query": everything_params.get("q", "N/A"),
-                "country_code": headlines_params.get("country", "N/A"),
-                "used_endpoint": "mock_data"
-            }
-            return mock_data
+            for candidate in representatives:
+                yield candidate
+                yielded += 1
+                if yielded >= self.candidate_limit:
+                    return
             
-        except Exception as e:
-            print(f"Exception in news service: {str(e)}")
-            # Fall back to mock data on any error
-            self.use_mock = True
-            # Import mock_news only when needed to avoid circular imports
-            from app.utils import mock_news
-            mock_data = mock_news.get_mock_news(location)
-            self.last_search_queries = {
-                "error": str(e),
-                "used_endpoint": "mock_data (error fallback)"
-            }
-            return mock_data
-
-    def _process_articles(self, articles, location=None):
-        processed_articles = []
-        # First process all articles to have a larger pool to filter from
-        for article in articles[:20]:  # Process more articles initially to account for filtering
-            processed_article = {
-                "title": article.get("title", ""),
-                "description": article.get("description", ""),
-                "content": article.get("content", ""),
-                "url": article.get("url", ""),
-                "urlToImage": article.get("urlToImage", ""),
-                "source": article.get("source", {}).get("name", "Unknown Source"),
-                "publishedAt": article.get("publishedAt", "")
-            }
-            processed_articles.append(processed_article)
-        
+            # A short page means the query has no more results
+            if pagination is None or page >= self.max_pages or page_size < pagination["params"].get("pageSize", 0):
+                return
+            page += 1
+            logger.debug("Fetching page %s of %s for more candidates", page, pagination['endpoint'])
+            articles = await self._fetch_endpoint(pagination["endpoint"], dict(pagination["params"], page=page))
+            if not articles:
+                return
+            page_size = len(articles)
+
+    @staticmethod
+    def _normalize_article(article):
+        return {
+            "title": article.get("title", ""),
+            "description": article.get("description", ""),
+            "content": article.get("content", ""),
+            "url": article.get("url", ""),
+            "urlToImage": article.get("urlToImage", ""),
+            "source": article.get("source", {}).get("name", "Unknown Source"),
+            "publishedAt": article.get("publishedAt", "")
+        }
+
+    async def _iter_processed_articles(self, candidates, location=None, vetting_stats=None):
         # If location is provided, vet articles for relevance
         if location:
-            return self._vet_articles_for_location(processed_articles, location)
+            async for article in self._iter_vetted_articles(candidates, location, vetting_stats):
+                yield article
+            return
         
         # Otherwise just return the first 16 articles
-        return processed_articles[:16]
+        async for article in self._take(candidates, 16):
+            yield article
+
+    @staticmethod
+    async def _take(candidates, limit):
+        """Yield at most ``limit`` articles from an async iterator without pulling any more"""
+        if limit <= 0:
+            return
+        count = 0
+        async for article in candidates:
+            yield article
+            count += 1
+            if count >= limit:
+                return
         
-    def get_search_queries(self):
+    async def _fetch_endpoint(self, endpoint, params):
         """
-        Return the search queries that were used in the last API call
-        """
-        return self.last_search_queries
+        Query one NewsAPI endpoint
         
+        Args:
+            endpoint (str): ``top-headlines`` or ``everything``
+            params (dict): Query parameters
+            
+        Returns:
+            list: Raw articles (empty if nothing was found), or None if the request failed
+        """
+        try:
+            with span("newsapi_fetch"):
+                response = await self.upstream.call(
+                    lambda: self.client.get(f"{self.base_url}/{endpoint}", params=params)
+                )
+            logger.debug("%s response status: %s", endpoint, response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("totalResults", 0) > 0 or data.get("articles"):
+                    articles = data.get("articles", [])
+                    logger.info("Found %s articles from %s endpoint", len(articles), endpoint)
+                    return articles
+                logger.info("No articles found in %s endpoint", endpoint)
+                return []
+            error_data = response.json() if response.content else {"message": "Unknown error"}
+            logger.warning("%s endpoint error: %s - %s", endpoint, response.status_code, error_data)
+        except Exception as endpoint_error:
+            logger.warning("Error with %s endpoint: %s", endpoint, endpoint_error)
+        return None
+
+    @staticmethod
+    def _merge_articles(*article_lists):
+        """Concatenate article lists, dropping repeats of a URL already seen"""
+        seen_urls = set()
+        merged = []
+        for articles in article_lists:
+            for article in articles:
+                url = article.get("url")
+                if url:
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                merged.append(article)
+        return merged
+
     def _generate_article_hash(self, article):
         """
         Generate a unique hash for an article based on its URL and title
@@ -220,9 +483,12 @@ class NewsService:
         hash_input = f"{url}|{title}"
         return hashlib.md5(hash_input.encode('utf-8')).hexdigest()
     
-    def _get_cached_summary(self, article_hash):
+    async def _get_cached_summary(self, article_hash):
         """
         Get a cached summary for an article if it exists
+
+        Only the in-memory cache is read on the event loop; the SQLite store is read in a
+        worker thread so a write lock held by another process cannot stall other requests.
         
         Args:
             article_hash (str): The hash of the article
@@ -230,9 +496,15 @@ class NewsService:
         Returns:
             str: The cached summary or None if not found
         """
-        return self.summary_cache.get(article_hash)
+        summary = self.summary_cache.get(article_hash)
+        if summary is None and self.summary_store is not None:
+            # Another worker (or a previous deploy) may already have summarized it
+            summary = await asyncio.to_thread(self.summary_store.get_cached_summary, article_hash)
+            if summary is not None:
+                self.summary_cache.put(article_hash, summary)
+        return summary
     
-    def _cache_summary(self, article_hash, summary):
+    async def _cache_summary(self, article_hash, summary):
         """
         Cache a summary for an article
         
@@ -240,198 +512,382 @@ class NewsService:
             article_hash (str): The hash of the article
             summary (str): The summary to cache
         """
-        self.summary_cache[article_hash] = summary
-        
-        # Keep cache size reasonable (limit to 1000 entries)
-        if len(self.summary_cache) > 1000:
-            # Remove oldest entries (simple approach: just remove some random entries)
-            keys_to_remove = list(self.summary_cache.keys())[:100]
-            for key in keys_to_remove:
-                del self.summary_cache[key]
-    
-    def _check_relevance_for_cached_article(self, cached_summary, target_region):
+        self.summary_cache.put(article_hash, summary)
+        if self.summary_store is not None:
+            await asyncio.to_thread(self.summary_store.cache_summary, article_hash, summary)
+
+    def _verdict_key(self, article_hash, target_region):
+        """Build the verdict cache key for an article and region"""
+        return f"{article_hash}|{' '.join(target_region.split()).casefold()}|{self.verdict_version}"
+
+    async def _get_cached_verdict(self, article_hash, target_region):
         """
-        Check if a cached article summary is relevant to the target region
+        Get a cached relevance verdict for an article and region if it exists and has not expired
         
         Args:
-            cached_summary (str): The cached summary of the article
-            target_region (str): The target region to check relevance for
+            article_hash (str): The hash of the article
+            target_region (str): The region the verdict was made for
             
         Returns:
-            dict: A result object with relevance information
+            dict: ``mentions_region``, ``relevance_score`` and ``justification``, or None
         """
-        prompt = f"""Given this summary of a news article, determine if the state/region '{target_region}' is EXPLICITLY mentioned or DIRECTLY relevant.
-        
-        Summary: {cached_summary}
-        
-        Apply STRICT criteria for relevance:
-        - The summary must EXPLICITLY mention '{target_region}' by name OR
-        - The summary must discuss events, policies, or issues that DIRECTLY and SPECIFICALLY impact '{target_region}'
-        
-        Respond with a JSON object with this format: {{
-            "mentions_region": true|false,
-            "relevance_score": 0-10 (where 0 means completely irrelevant and 10 means directly about this region),
-            "justification": "Brief explanation of why this article is or is not relevant to the region"
-        }}
+        key = self._verdict_key(article_hash, target_region)
+        verdict = self.verdict_cache.get(key)
+        if verdict is None and self.verdict_store is not None:
+            verdict = await asyncio.to_thread(self.verdict_store.get_cached_verdict, key)
+            if verdict is not None:
+                self.verdict_cache.put(key, verdict)
+        return verdict
+
+    async def _get_stored_verdict(self, article_hash, target_region):
+        """
+        Return an earlier build's verdict for an article, if it can be reused as is; the
+        article store is read in a worker thread
+
+        When summaries come from the LLM, a relevant article also needs an LLM summary; one
+        with only an extractive summary is vetted again so the LLM can replace it.
+
+        Returns:
+            dict: The verdict with ``summary`` and ``summary_source`` if summarized, or None
+        """
+        if self.article_store is None:
+            return None
+        stored = await asyncio.to_thread(self.article_store.get_verdict, article_hash, target_region, self.verdict_version)
+        if stored is None:
+            return None
+        if (self.openai_service.summary_mode == SOURCE_LLM and stored["mentions_region"]
+                and stored["relevance_score"] >= 7 and stored["summary_source"] != SOURCE_LLM):
+            return None
+        return {key: value for key, value in stored.items() if value is not None}
+
+    async def search_stored(self, location, limit=16):
         """
+        Return a location's articles from the local article store, without calling NewsAPI
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+            limit (int): Maximum number of articles
+
+        Returns:
+            list: Articles as produced by vetting, relevant ones first; empty if there is no store
+        """
+        if self.article_store is None:
+            return []
+        region = location.get("region") or location.get("country")
+        try:
+            return await asyncio.to_thread(self.article_store.search_region, region, limit=limit)
+        except Exception as e:
+            logger.warning("Error searching the article store: %s", e)
+            return []
+
+    async def _cache_verdict(self, article_hash, target_region, result):
+        """
+        Cache the relevance verdict from an LLM result
         
+        Args:
+            article_hash (str): The hash of the article
+            target_region (str): The region the verdict was made for
+            result (dict): The LLM result containing the verdict fields
+        """
+        key = self._verdict_key(article_hash, target_region)
+        verdict = {
+            "mentions_region": result.get("mentions_region", False),
+            "relevance_score": result.get("relevance_score", 0),
+            "justification": result.get("justification", "No justification provided")
+        }
+        self.verdict_cache.put(key, verdict)
+        if self.verdict_store is not None:
+            await asyncio.to_thread(self.verdict_store.cache_verdict, key, verdict)
+    
+    @staticmethod
+    def _count_llm_calls(vetting_stats, made=0, saved=0):
+        # Only the pre-filter's decisions count as saved; reused verdicts are in "from_store"
+        if vetting_stats is not None:
+            vetting_stats["llm_calls"] += made
+            vetting_stats["llm_calls_saved"] += saved
+
+    async def _vet_article(self, article, target_region, vetting_stats=None, batcher=None):
+        """
+        Summarize a single article and check whether it is relevant to the target region
+
+        The summary and AI analysis are stored on the article itself. Articles an earlier
+        build already vetted for the region reuse that verdict from the article store.
+        Clear-cut cases are decided by the local pre-filter; only uncertain articles get an
+        LLM verdict. If that call fails (for example while OpenAI's circuit is open), the
+        pre-filter score is used.
+
+        Args:
+            article (dict): The processed article to vet
+            target_region (str): The state/region the article should be about
+            vetting_stats (dict): Optional per-request counters, updated in place
+            batcher (BatchClassifier): Optional batcher that packs summarize-and-classify calls;
+                its calls are counted by the caller
+
+        Returns:
+            bool: True if the article passes the strict relevance criteria
+        """
         try:
-            # This API call is much smaller since we're only sending the summary
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "system", "content": prompt}],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
+            # Generate a unique hash for this article to use as cache key
+            article_hash = self._generate_article_hash(article)
             
-            # Parse the response
-            result = json.loads(response.choices[0].message.content)
-            # Add the cached summary to the result
-            result["summary"] = cached_summary
-            return result
+            # Check if we have a cached summary for this article
+            cached_summary = await self._get_cached_summary(article_hash)
+            # Without an LLM summary the verdict is only reused when summaries are extractive anyway
+            cached_verdict = None
+            if cached_summary or self.openai_service.summary_mode == SOURCE_EXTRACTIVE:
+                cached_verdict = await self._get_cached_verdict(article_hash, target_region)
+            stored = None
+            if not cached_verdict:
+                stored = await self._get_stored_verdict(article_hash, target_region)
             
-        except Exception as e:
-            print(f"Error checking relevance for cached article: {str(e)}")
-            # Return a default result that will likely not pass the relevance check
-            return {
-                "summary": cached_summary,
-                "mentions_region": False,
-                "relevance_score": 0,
-                "justification": "Error checking relevance for cached summary"
+            local_verdict = None
+            if not cached_verdict and not stored and self.prefilter is not None:
+                with span("prefilter"):
+                    local_verdict, confidence, matched = self.prefilter.classify(article, target_region)
+                if vetting_stats is not None:
+                    vetting_stats[f"prefilter_{local_verdict}"] += 1
+            if vetting_stats is not None:
+                vetting_stats["vetted"] += 1
+            
+            if cached_verdict:
+                logger.debug("Using cached verdict for article: %s...", article.get('title', '')[:40])
+                result = dict(cached_verdict)
+                if cached_summary:
+                    result["summary"] = cached_summary
+                else:
+                    result.update(self.openai_service.extractive_summary(article))
+            elif stored:
+                logger.debug("Using the stored verdict for article: %s...", article.get('title', '')[:40])
+                result = stored
+                if vetting_stats is not None:
+                    vetting_stats["from_store"] += 1
+            elif local_verdict == IRRELEVANT:
+                # Nothing in the text names the region, so the LLM could not find a mention either
+                result = {
+                    "mentions_region": False,
+                    "relevance_score": 0,
+                    "justification": f"Pre-filter: no mention of {target_region} or its cities"
+                }
+                if cached_summary:
+                    result["summary"] = cached_summary
+                else:
+                    # Summarized locally too, so padding the feed with it costs no LLM call later
+                    result.update(self.openai_service.extractive_summary(article))
+                self._count_llm_calls(vetting_stats, saved=1)
+            elif local_verdict == RELEVANT:
+                result = {
+                    "mentions_region": True,
+                    "relevance_score": 8,
+                    "justification": f"Pre-filter: mentions {', '.join(matched)} (confidence {confidence})"
+                }
+                if cached_summary:
+                    result["summary"] = cached_summary
+                    self._count_llm_calls(vetting_stats, saved=1)
+                else:
+                    # The verdict is settled locally; only the summary needs the LLM
+                    if self.openai_service.summary_mode == SOURCE_EXTRACTIVE:
+                        self._count_llm_calls(vetting_stats, saved=1)
+                    else:
+                        self._count_llm_calls(vetting_stats, made=1)
+                    result.update(await self.openai_service.summarize(article))
+                    if result["summary_source"] == SOURCE_LLM:
+                        await self._cache_summary(article_hash, result["summary"])
+            elif cached_summary:
+                logger.debug("Using cached summary for article: %s...", article.get('title', '')[:40])
+                # We still need to check relevance for this specific region
+                # Counted up front: a call cancelled once enough articles passed was still sent
+                self._count_llm_calls(vetting_stats, made=1)
+                result = await self.openai_service.check_relevance(cached_summary, target_region)
+            else:
+                if batcher is not None:
+                    # Summarize and check relevance in a call shared with other articles
+                    result = await batcher.summarize_and_classify(article)
+                else:
+                    # Summarize and check relevance in one call
+                    self._count_llm_calls(vetting_stats, made=1)
+                    result = await self.openai_service.summarize_and_classify(article, target_region)
+                
+                # Cache the summary; extractive ones are left for the LLM to replace later
+                if result.get("summary") and result.get("summary_source") == SOURCE_LLM:
+                    await self._cache_summary(article_hash, result["summary"])
+            
+            if "error" in result and local_verdict == UNCERTAIN:
+                # Without an LLM verdict, how clearly the text names the region is the best guess
+                logger.warning("Falling back to the pre-filter verdict: %s", result['error'])
+                result = {
+                    "mentions_region": True,
+                    "relevance_score": round(confidence * 10),
+                    "justification": f"Pre-filter fallback: mentions {', '.join(matched)} (confidence {confidence})",
+                    "error": result["error"],
+                    **{key: result[key] for key in ("summary", "summary_source") if key in result}
+                }
+            
+            # Failed calls are not cached so they are retried on the next request, and local
+            # verdicts are cheaper to recompute than to store
+            if not cached_verdict and not stored and local_verdict not in (RELEVANT, IRRELEVANT) and "error" not in result:
+                await self._cache_verdict(article_hash, target_region, result)
+                    
+            # Add the summary to the article so the route can reuse it
+            if result.get("summary"):
+                article["ai_summary"] = result["summary"]
+                # Cached summaries always came from the LLM
+                article["summary_source"] = result.get("summary_source", SOURCE_LLM)
+            
+            # Check if the article mentions or is relevant to the region - using stricter criteria
+            mentions_region = result.get("mentions_region", False)
+            relevance_score = result.get("relevance_score", 0)
+            justification = result.get("justification", "No justification provided")
+            
+            # Store the AI analysis in the article object
+            article["ai_analysis"] = {
+                "mentions_region": mentions_region,
+                "relevance_score": relevance_score,
+                "justification": justification
             }
-        
-    def _vet_articles_for_location(self, articles, location):
+            if self.article_store is not None and "error" not in result:
+                # Also refreshes when the article was last seen, which keeps it in the store
+                await asyncio.to_thread(
+                    self.article_store.record, article_hash, dict(article), target_region, article["ai_analysis"], self.verdict_version
+                )
+            
+            # Stricter criteria: Must explicitly mention region AND have a high relevance score
+            if mentions_region and relevance_score >= 7:
+                logger.debug("Article HIGHLY relevant to %s (score: %s): %s", target_region, relevance_score, article.get('title'))
+                logger.debug("Justification: %s", justification)
+                return True
+            logger.debug("Article NOT sufficiently relevant to %s (score: %s): %s", target_region, relevance_score, article.get('title'))
+            logger.debug("Justification: %s", justification)
+            return False
+        except asyncio.CancelledError:
+            raise
+        except Exception as article_error:
+            logger.warning("Error processing article: %s", article_error)
+            # If there's an error, we'll consider the article not relevant
+            return False
+
+    @staticmethod
+    def _new_vetting_stats():
+        """Return empty per-request counters for the vetting stage"""
+        return {
+            "vetted": 0,
+            "prefilter_relevant": 0,
+            "prefilter_irrelevant": 0,
+            "prefilter_uncertain": 0,
+            "from_store": 0,
+            "llm_calls": 0,
+            "llm_calls_saved": 0
+        }
+
+    async def _iter_vetted_articles(self, candidates, location, vetting_stats=None):
         """
-        Use AI to summarize each article and check if the state/region is mentioned in the summary.
-        Continue fetching articles until 10 slots are filled with relevant articles.
+        Vet articles for relevance to the location and yield the ones that make the feed, in feed order.
+        Candidates are pulled from ``candidates`` only while fewer than 10 relevant articles have been
+        found, and at most ``vetting_concurrency`` LLM calls (each covering up to the OpenAI service's
+        ``batch_size`` articles) are in flight at the same time.
+        Vetting stops as soon as the first 10 candidates, in original order, pass the relevance check.
+        A passing article is yielded as soon as every article before it has been vetted, so callers
+        can start using the feed after the first few LLM calls.
         
         Args:
-            articles (list): List of processed articles
+            candidates: Async iterator of processed articles
             location (dict): Location information containing city, region, country, etc.
+            vetting_stats (dict): Optional counters from ``_new_vetting_stats``, updated in place
             
-        Returns:
-            list: List of articles that are relevant to the location, limited to 16
+        Yields:
+            dict: Articles relevant to the location, at most 16
         """
-        if not articles:
-            return []
-            
-        # Skip vetting if OpenAI API key is not available
-        if not os.getenv("OPENAI_API_KEY"):
-            print("OpenAI API key not found, skipping article vetting")
-            return articles[:16]
-            
+        # Get the state/region we're looking for
+        target_region = location.get("region", "")
+        
+        # Skip vetting if OpenAI API key or the region is not available
+        if not os.getenv("OPENAI_API_KEY") or not target_region:
+            if not os.getenv("OPENAI_API_KEY"):
+                logger.warning("OpenAI API key not found, skipping article vetting")
+            else:
+                logger.info("No region/state information available for vetting")
+            async for article in self._take(candidates, 16):
+                yield article
+            return
+        
+        if vetting_stats is None:
+            vetting_stats = self._new_vetting_stats()
+        # Candidates pulled so far, in original order
+        articles_to_process = []
+        # Strictly relevant articles already handed to the caller
+        relevant_articles = []
         try:
-            # Get the state/region we're looking for
-            target_region = location.get("region", "")
-            if not target_region:
-                print("No region/state information available for vetting")
-                return articles[:16]
-                
-            print(f"Vetting articles for relevance to state/region: {target_region}")
+            logger.info("Vetting articles for relevance to state/region: %s", target_region)
             
-            # Process articles one by one until we have 10 relevant ones
-            relevant_articles = []
-            articles_to_process = list(articles)  # Create a copy to avoid modifying the original
-            processed_count = 0
+            batch_size = self.openai_service.batch_size
+            batcher = self.openai_service.batch_classifier(target_region) if batch_size > 1 else None
+            # Articles in flight at once; batched calls carry several articles each
+            window = self.vetting_concurrency * batch_size
+            tasks = []
+            task_index = {}
+            pending = set()
+            passed = set()
+            # Everything at or beyond this index is not needed once 10 earlier articles pass
+            cutoff = None
+            # First article whose verdict has not been handed on yet
+            next_index = 0
+            exhausted = False
             
-            while len(relevant_articles) < 10 and processed_count < len(articles_to_process):
-                try:
-                    article = articles_to_process[processed_count]
-                    processed_count += 1
-                    
-                    # Extract article content for summarization
-                    article_content = f"Title: {article.get('title', '')}"
-                    if article.get('description'):
-                        article_content += f"\nDescription: {article.get('description')}"
-                    if article.get('content'):
-                        article_content += f"\nContent: {article.get('content')}"
-                    
-                    # Generate a unique hash for this article to use as cache key
-                    article_hash = self._generate_article_hash(article)
-                    
-                    # Check if we have a cached summary for this article
-                    cached_summary = self._get_cached_summary(article_hash)
-                    
-                    if cached_summary:
-                        print(f"Using cached summary for article: {article.get('title', '')[:40]}...")
-                        # We still need to check relevance for this specific region
-                        result = self._check_relevance_for_cached_article(cached_summary, target_region)
-                    else:
-                        # Create a prompt for the AI to summarize and check relevance
-                        prompt = f"""Summarize the following news article in 2-3 sentences. Then determine if the state/region '{target_region}' is EXPLICITLY mentioned or DIRECTLY relevant to the article content.
-                        
-                        Article:
-                        {article_content}
-                        
-                        Apply STRICT criteria for relevance:
-                        - The article must EXPLICITLY mention '{target_region}' by name OR
-                        - The article must discuss events, policies, or issues that DIRECTLY and SPECIFICALLY impact '{target_region}' (not just general news that might affect many regions)
-                        - Articles about nearby regions or general national news should NOT be considered relevant unless they specifically discuss impacts on '{target_region}'
-                        
-                        Respond with a JSON object with this format: {{
-                            "summary": "Your 2-3 sentence summary here",
-                            "mentions_region": true|false,
-                            "relevance_score": 0-10 (where 0 means completely irrelevant and 10 means directly about this region),
-                            "justification": "Brief explanation of why this article is or is not relevant to the region"
-                        }}
-                        """
-                        
+            try:
+                while True:
+                    # Keep the LLM busy with the next candidates in order while more relevant
+                    # articles are still needed; pulling a candidate may fetch the next page
+                    while not exhausted and cutoff is None and len(pending) < window:
                         try:
-                            # Call the OpenAI API for this specific article
-                            response = self.openai_client.chat.completions.create(
-                                model="gpt-3.5-turbo",
-                                messages=[{"role": "system", "content": prompt}],
-                                temperature=0.1,
-                                response_format={"type": "json_object"}
-                            )
-                            
-                            # Parse the response
-                            result = json.loads(response.choices[0].message.content)
-                            
-                            # Cache the summary
-                            if "summary" in result:
-                                self._cache_summary(article_hash, result["summary"])
-                        except Exception as e:
-                            print(f"Error summarizing article: {str(e)}")
-                            result = {
-                                "summary": "Error generating summary",
-                                "mentions_region": False,
-                                "relevance_score": 0,
-                                "justification": "Error processing article"
-                            }
-                            
-                    # Add the summary to the article
-                    article["ai_summary"] = result.get("summary", "No summary available")
+                            article = await candidates.__anext__()
+                        except StopAsyncIteration:
+                            exhausted = True
+                            break
+                        task = asyncio.create_task(self._vet_article(article, target_region, vetting_stats, batcher))
+                        task_index[task] = len(tasks)
+                        tasks.append(task)
+                        articles_to_process.append(article)
+                        pending.add(task)
+                    if not pending:
+                        break
                     
-                    # Check if the article mentions or is relevant to the region - using stricter criteria
-                    mentions_region = result.get("mentions_region", False)
-                    relevance_score = result.get("relevance_score", 0)
-                    justification = result.get("justification", "No justification provided")
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    passed.update(task_index[task] for task in done if task.result())
                     
-                    # Store the AI analysis in the article object
-                    article["ai_analysis"] = {
-                        "mentions_region": mentions_region,
-                        "relevance_score": relevance_score,
-                        "justification": justification
-                    }
+                    if len(passed) >= 10:
+                        # Only the first 10 passing articles in original order are kept, so any
+                        # article after the 10th of them can never change the result
+                        cutoff = sorted(passed)[9] + 1
+                        for task in pending:
+                            if task_index[task] >= cutoff:
+                                task.cancel()
+                        pending = {task for task in pending if task_index[task] < cutoff}
                     
-                    # Stricter criteria: Must explicitly mention region AND have a high relevance score
-                    if mentions_region and relevance_score >= 7:
-                        print(f"Article HIGHLY relevant to {target_region} (score: {relevance_score}): {article.get('title')}")
-                        print(f"Justification: {justification}")
-                        relevant_articles.append(article)
-                    else:
-                        print(f"Article NOT sufficiently relevant to {target_region} (score: {relevance_score}): {article.get('title')}")
-                        print(f"Justification: {justification}")
-                except Exception as article_error:
-                    print(f"Error processing article: {str(article_error)}")
-                    # If there's an error, we'll consider the article not relevant
+                    # Hand on every passing article whose predecessors have all been vetted;
+                    # its position in the feed can no longer change
+                    limit = len(tasks) if cutoff is None else cutoff
+                    while next_index < limit and tasks[next_index].done():
+                        if next_index in passed:
+                            relevant_articles.append(articles_to_process[next_index])
+                            yield articles_to_process[next_index]
+                        next_index += 1
+            finally:
+                # Cancel calls that are still in flight (early stop or caller cancellation)
+                leftover = [task for task in tasks if not task.done()]
+                for task in leftover:
+                    task.cancel()
+                await asyncio.gather(*leftover, return_exceptions=True)
+                if batcher is not None:
+                    await batcher.close()
+                    self._count_llm_calls(vetting_stats, made=batcher.calls)
             
-            print(f"Found {len(relevant_articles)} articles relevant to {target_region} after processing {processed_count} articles")
+            processed_count = len(tasks) if cutoff is None else cutoff
+            strict_count = len(relevant_articles)
+            logger.info("Found %s articles relevant to %s after processing %s articles", strict_count, target_region, processed_count)
+            logger.debug("Vetting stats for %s: %s", target_region, vetting_stats)
             
             # If we don't have enough relevant articles, try with slightly less strict criteria
-            if len(relevant_articles) < 5 and processed_count >= len(articles_to_process):
-                print(f"Very few highly relevant articles found, applying less strict criteria for a second pass")
+            if len(relevant_articles) < 5 and cutoff is None:
+                logger.info("Very few highly relevant articles found, applying less strict criteria for a second pass")
                 
                 # Second pass with less strict criteria
                 for article in articles_to_process:
@@ -443,19 +899,25 @@ class NewsService:
                         # Less strict criteria for second pass
                         if (article["ai_analysis"].get("mentions_region", False) or 
                             article["ai_analysis"].get("relevance_score", 0) >= 5):
-                            print(f"Adding article with moderate relevance to {target_region}: {article.get('title')}")
+                            logger.debug("Adding article with moderate relevance to %s: %s", target_region, article.get('title'))
                             relevant_articles.append(article)
                             if len(relevant_articles) >= 10:
                                 break
             
             # If we still don't have enough relevant articles, supplement with the remaining articles
             if len(relevant_articles) < 10:
-                print(f"Not enough relevant articles found, supplementing with non-region specific articles")
+                logger.info("Not enough relevant articles found, supplementing with non-region specific articles")
                 remaining_articles = [a for a in articles_to_process if a not in relevant_articles]
-                return (relevant_articles + remaining_articles)[:16]
+                feed = (relevant_articles + remaining_articles)[:16]
             else:
-                return relevant_articles[:16]
+                feed = relevant_articles[:16]
+            
+            # The strictly relevant articles at the front of the feed were already yielded
+            for article in feed[strict_count:]:
+                yield article
                 
         except Exception as e:
-            print(f"Error during article vetting: {str(e)}")
-            return articles[:16]
+            logger.error("Error during article vetting: %s", e)
+            remaining_articles = [a for a in articles_to_process if a not in relevant_articles]
+            for article in remaining_articles[:16 - len(relevant_articles)]:
+                yield article
@@ -1,17 +1,48 @@
 import os
-from openai import OpenAI
+import logging
+import json
+import asyncio
 from dotenv import load_dotenv
 
+from app.utils.http_clients import create_openai_client, create_upstream_policy
+from app.utils.resilience import UpstreamUnavailable
+from app.utils import extractive_summarizer, prompt_builder
+from app.utils.extractive_summarizer import SOURCE_EXTRACTIVE, SOURCE_LLM
+from app.utils.metrics import LLM_CALLS, LLM_TOKENS, SUMMARIES, span
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
 class OpenAIService:
     """Service for interacting with OpenAI API"""
     
-    def __init__(self):
+    def __init__(self, client=None, upstream=None):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key)
+        # Shared AsyncOpenAI client, normally attached by the app lifespan
+        self.openai_client = client
+        # Rate limit, retries and circuit breaker for every OpenAI call
+        self.upstream = upstream or create_upstream_policy("OPENAI", rate_limit=20, burst=40)
         self.model = "gpt-3.5-turbo"  # Can also use "gpt-4o-mini" if available
+        # "llm" writes summaries with the model; "extractive" writes them locally and only
+        # asks the model for relevance verdicts
+        self.summary_mode = os.getenv("SUMMARY_MODE", SOURCE_LLM).lower()
+        # Seconds an LLM summary may take before the extractive one is used instead (0 waits)
+        self.summary_deadline = float(os.getenv("OPENAI_SUMMARY_DEADLINE", "10")) or None
+        # Articles packed into one summarize-and-classify call; 1 sends one call per article
+        self.batch_size = max(1, int(os.getenv("OPENAI_BATCH_SIZE", "4")))
+        if self.summary_mode == SOURCE_EXTRACTIVE:
+            # Relevance checks of local summaries are small enough to send one by one
+            self.batch_size = 1
+
+    @property
+    def client(self):
+        """Return the shared AsyncOpenAI client, creating a private one if none was attached"""
+        if self.openai_client is None:
+            self.openai_client = create_openai_client()
+        return self.openai_client
         
     async def summarize_article(self, article):
         """
@@ -24,25 +55,10 @@ class OpenAIService:
             str: Summarized article text
         """
         try:
-            # Prepare article text for summarization
-            article_text = f"Title: {article.get('title', '')}\n"
-            article_text += f"Description: {article.get('description', '')}\n"
-            
-            # Add content if available and not too long
-            content = article.get('content', '')
-            if content and len(content) < 4000:
-                article_text += f"Content: {content}\n"
-            
-            # Create the prompt
-            prompt = f"Summarize the following news article in 2-3 concise sentences. Do not use any introductory phrases like 'Hey there', 'Did you know', or greetings. Do not repeat the title or start with phrases like 'Title:' or 'This article:'. Start directly with the summary content: {article_text}"
-            
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes news articles in a clear, direct manner without using introductory phrases, greetings, or meta-references to the article itself. Provide only the essential information."},
-                    {"role": "user", "content": prompt}
-                ],
+            response = await self._complete(
+                "summary",
+                messages=prompt_builder.summary_messages(article),
                 max_tokens=150,
                 temperature=0.7
             )
@@ -53,3 +69,335 @@ class OpenAIService:
             
         except Exception as e:
             return f"Error generating summary: {str(e)}"
+
+    async def summarize(self, article):
+        """
+        Summarize an article with the LLM, or extractively in fast mode or when the LLM
+        fails or misses the summary deadline
+
+        Args:
+            article (dict): Article containing title, description, and content
+
+        Returns:
+            dict: ``summary`` and ``summary_source`` (``llm`` or ``extractive``)
+        """
+        if self.summary_mode != SOURCE_EXTRACTIVE:
+            try:
+                summary = await asyncio.wait_for(self.summarize_article(article), self.summary_deadline)
+            except asyncio.TimeoutError:
+                summary = f"Error generating summary: no answer within {self.summary_deadline}s"
+            if not summary.startswith("Error generating summary"):
+                SUMMARIES.inc(source=SOURCE_LLM)
+                return {"summary": summary, "summary_source": SOURCE_LLM}
+            logger.warning("Using an extractive summary: %s", summary)
+        return self.extractive_summary(article)
+
+    def extractive_summary(self, article):
+        """
+        Summarize an article locally from its own sentences, without calling OpenAI
+
+        Args:
+            article (dict): Article containing title, description, and content
+
+        Returns:
+            dict: ``summary`` and ``summary_source`` (always ``extractive``)
+        """
+        SUMMARIES.inc(source=SOURCE_EXTRACTIVE)
+        return {"summary": extractive_summarizer.summarize(article), "summary_source": SOURCE_EXTRACTIVE}
+
+    async def summarize_and_classify(self, article, target_region):
+        """
+        Summarize an article and judge its relevance to a region in a single call
+
+        In fast mode the summary is extractive and only the relevance verdict comes from
+        the model. If the call fails or misses the summary deadline, the extractive summary
+        is returned with the error.
+
+        Args:
+            article (dict): Article containing title, description, and content
+            target_region (str): The state/region the article should be about
+
+        Returns:
+            dict: ``summary``, ``summary_source``, ``mentions_region``, ``relevance_score`` and
+                ``justification``. On failure ``error`` is set as well.
+        """
+        if self.summary_mode == SOURCE_EXTRACTIVE:
+            local = self.extractive_summary(article)
+            return dict(await self.check_relevance(local["summary"], target_region), **local)
+        try:
+            result = await asyncio.wait_for(
+                self._classify(prompt_builder.classify_messages(article, target_region), "classify"),
+                self.summary_deadline
+            )
+            if isinstance(result.get("summary"), str) and result["summary"].strip():
+                SUMMARIES.inc(source=SOURCE_LLM)
+                result["summary_source"] = SOURCE_LLM
+            return result
+        except Exception as e:
+            error = str(e) or f"no answer within {self.summary_deadline}s"
+            logger.warning("Error summarizing article: %s", error)
+            return dict(
+                self.extractive_summary(article),
+                mentions_region=False,
+                relevance_score=0,
+                justification="Error processing article",
+                error=error
+            )
+
+    async def summarize_and_classify_batch(self, articles, target_region):
+        """
+        Summarize several articles and judge their relevance to a region in a single call
+
+        Args:
+            articles (list): Articles containing title, description, and content
+            target_region (str): The state/region the articles should be about
+
+        Returns:
+            dict: Validated results (as returned by ``summarize_and_classify``) keyed by the
+                article's index in ``articles``; articles the model dropped or answered with an
+                invalid item are missing
+        """
+        items = [prompt_builder.batch_item(f"a{index}", article) for index, article in enumerate(articles)]
+        response = await self._complete(
+            "batch_classify",
+            messages=prompt_builder.batch_classify_messages(items, target_region),
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+        items = json.loads(response.choices[0].message.content).get("articles")
+        
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+                continue
+            index = item["id"][1:]
+            if not index.isdigit() or int(index) >= len(articles) or int(index) in results:
+                continue
+            result = self._validate_result(item)
+            if result is not None:
+                results[int(index)] = result
+        return results
+
+    @staticmethod
+    def _validate_result(item):
+        """Return a clean summarize-and-classify result, or None if the item is unusable"""
+        summary = item.get("summary")
+        mentions_region = item.get("mentions_region")
+        relevance_score = item.get("relevance_score")
+        if not isinstance(summary, str) or not summary.strip() or not isinstance(mentions_region, bool):
+            return None
+        if isinstance(relevance_score, str) and relevance_score.strip().isdigit():
+            relevance_score = int(relevance_score)
+        if isinstance(relevance_score, bool) or not isinstance(relevance_score, (int, float)):
+            return None
+        SUMMARIES.inc(source=SOURCE_LLM)
+        return {
+            "summary": summary.strip(),
+            "summary_source": SOURCE_LLM,
+            "mentions_region": mentions_region,
+            "relevance_score": max(0, min(10, relevance_score)),
+            "justification": str(item.get("justification") or "No justification provided")
+        }
+
+    def batch_classifier(self, target_region):
+        """
+        Create a batcher that packs concurrent ``summarize_and_classify`` calls for a region
+
+        Args:
+            target_region (str): The state/region the articles should be about
+
+        Returns:
+            BatchClassifier: The batcher, to be closed once vetting is done
+        """
+        return BatchClassifier(
+            self,
+            target_region,
+            batch_size=self.batch_size,
+            token_budget=int(os.getenv("OPENAI_BATCH_TOKEN_BUDGET", "3000")),
+            linger=float(os.getenv("OPENAI_BATCH_LINGER", "0.02"))
+        )
+
+    async def check_relevance(self, summary, target_region):
+        """
+        Judge whether an already summarized article is relevant to a region
+
+        Args:
+            summary (str): The existing summary of the article
+            target_region (str): The state/region the article should be about
+
+        Returns:
+            dict: ``summary`` (the one passed in), ``mentions_region``, ``relevance_score``
+                and ``justification``
+        """
+        try:
+            # This API call is much smaller since we're only sending the summary
+            result = await self._classify(prompt_builder.relevance_messages(summary, target_region), "relevance")
+        except Exception as e:
+            logger.warning("Error checking relevance for cached article: %s", e)
+            # Return a default result that will likely not pass the relevance check
+            result = {
+                "mentions_region": False,
+                "relevance_score": 0,
+                "justification": "Error checking relevance for cached summary",
+                "error": str(e)
+            }
+        # Keep the existing summary rather than anything the model returned
+        result["summary"] = summary
+        return result
+
+    async def _classify(self, messages, kind):
+        """Send a JSON-mode classification request and parse the response"""
+        response = await self._complete(
+            kind,
+            messages=messages,
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+        return json.loads(response.choices[0].message.content)
+
+    async def _complete(self, kind, **kwargs):
+        """
+        Create a chat completion with the service's model under the OpenAI upstream policy
+
+        The call is timed as the ``llm_<kind>`` stage and counted with its outcome and
+        the tokens it used.
+
+        Args:
+            kind (str): What the call is for: ``summary``, ``classify``, ``batch_classify``
+                or ``relevance``
+        """
+        try:
+            with span(f"llm_{kind}"):
+                response = await self.upstream.call(
+                    lambda: self.client.chat.completions.create(model=self.model, **kwargs)
+                )
+        except asyncio.CancelledError:
+            LLM_CALLS.inc(kind=kind, outcome="cancelled")
+            raise
+        except UpstreamUnavailable:
+            LLM_CALLS.inc(kind=kind, outcome="rejected")
+            raise
+        except Exception:
+            LLM_CALLS.inc(kind=kind, outcome="error")
+            raise
+        LLM_CALLS.inc(kind=kind, outcome="ok")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_tokens or 0, type="prompt")
+            LLM_TOKENS.inc(usage.completion_tokens or 0, type="completion")
+        return response
+
+
+class BatchClassifier:
+    """
+    Packs concurrent summarize-and-classify requests for one region into batched calls
+
+    Requests arriving within ``linger`` seconds of each other share a call, up to
+    ``batch_size`` articles or ``token_budget`` tokens of article text per call.
+    Articles the model drops or answers badly are retried one by one, and a batch
+    that fails outright is retried the same way (unless OpenAI is unavailable, in
+    which case every article gets the usual error result without a call).
+    """
+
+    def __init__(self, openai_service, target_region, batch_size=4, token_budget=3000, linger=0.02):
+        self.openai_service = openai_service
+        self.target_region = target_region
+        self.batch_size = batch_size
+        self.token_budget = token_budget
+        self.linger = linger
+        # Number of calls made so far, batched and single
+        self.calls = 0
+        # (article, future) waiting for the next batch
+        self._pending = []
+        self._pending_tokens = 0
+        self._timer = None
+        self._tasks = set()
+
+    async def summarize_and_classify(self, article):
+        """
+        Queue an article for the next batch and wait for its result
+
+        Args:
+            article (dict): Article containing title, description, and content
+
+        Returns:
+            dict: Same as ``OpenAIService.summarize_and_classify``
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = prompt_builder.count_tokens(json.dumps(prompt_builder.article_fields(article)))
+        if self._pending and self._pending_tokens + tokens > self.token_budget:
+            self._flush()
+        self._pending.append((article, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Requests cancelled while waiting (the vetter stopped early) are left out
+        batch = [(article, future) for article, future in self._pending if not future.done()]
+        self._pending = []
+        self._pending_tokens = 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            results = None
+            unavailable = False
+            if len(batch) > 1:
+                try:
+                    self.calls += 1
+                    results = await self.openai_service.summarize_and_classify_batch(
+                        [article for article, _ in batch], self.target_region
+                    )
+                except UpstreamUnavailable as e:
+                    logger.warning("Skipping batched summarize and classify: %s", e)
+                    self.calls -= 1
+                    unavailable = True
+                except Exception as e:
+                    logger.warning("Error in batched summarize and classify, retrying articles one by one: %s", e)
+            
+            retry = []
+            for index, (article, future) in enumerate(batch):
+                if results and index in results:
+                    if not future.done():
+                        future.set_result(results[index])
+                elif not future.done():
+                    retry.append((article, future))
+            if retry and results is not None:
+                logger.info("Batch answered %s of %s articles, retrying the rest one by one", len(batch) - len(retry), len(batch))
+            
+            async def single(article, future):
+                if not unavailable:
+                    self.calls += 1
+                result = await self.openai_service.summarize_and_classify(article, self.target_region)
+                if not future.done():
+                    future.set_result(result)
+            
+            await asyncio.gather(*(single(article, future) for article, future in retry))
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def close(self):
+        """Cancel batches still in flight, for example once vetting has stopped early"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,196 @@
+import os
+import logging
+import asyncio
+import datetime
+from collections import Counter
+from dotenv import load_dotenv
+
+from app.utils.tracing import trace_id
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_times(value):
+    """Parse ``"HH:MM,HH:MM"`` into a sorted list of ``datetime.time``"""
+    times = []
+    for part in value.split(","):
+        part = part.strip()
+        if part:
+            hour, _, minute = part.partition(":")
+            times.append(datetime.time(int(hour), int(minute or 0)))
+    return sorted(times)
+
+
+def _parse_regions(value):
+    """Parse ``"Region:CC,Region:CC"`` into location dicts"""
+    locations = []
+    for part in value.split(","):
+        region, _, country_code = part.strip().partition(":")
+        if region.strip():
+            locations.append({"region": region.strip(), "country_code": country_code.strip().upper()})
+    return locations
+
+
+class PrewarmScheduler:
+    """
+    Background task that builds the feeds of the most requested regions before users ask
+
+    Requests are counted per feed key. Every ``interval`` seconds the top
+    ``top_regions`` feeds (plus any configured seed regions) are rebuilt if their
+    cached copy is no longer fresh, and at each of ``times`` (local time, ahead of
+    the morning peak) they are rebuilt unconditionally and the counts are halved so
+    the ranking follows recent demand. At most ``concurrency`` warm builds run at
+    once, and warming pauses while ``max_live_builds`` or more user-triggered builds
+    are in flight, so it never competes with live traffic for upstream capacity.
+    """
+
+    def __init__(self, feed_service):
+        """
+        Args:
+            feed_service (FeedService): The service whose feed cache is warmed
+        """
+        self.feed_service = feed_service
+        self.enabled = os.getenv("PREWARM_ENABLED", "1") != "0"
+        self.top_regions = int(os.getenv("PREWARM_TOP_REGIONS", "10"))
+        self.interval = float(os.getenv("PREWARM_INTERVAL", "1800"))
+        self.times = _parse_times(os.getenv("PREWARM_TIMES", "05:30"))
+        self.concurrency = max(1, int(os.getenv("PREWARM_CONCURRENCY", "2")))
+        self.max_live_builds = max(1, int(os.getenv("PREWARM_MAX_LIVE_BUILDS", "4")))
+        self.max_tracked = max(1, int(os.getenv("PREWARM_TRACKED_REGIONS", "1000")))
+        # Regions warmed even before anyone has asked for them
+        self.seed_locations = _parse_regions(os.getenv("PREWARM_REGIONS", ""))
+        # Feed key -> number of requests, and the latest location requested for it
+        self.demand = Counter()
+        self.locations = {}
+        # Warm builds currently running
+        self.warming = 0
+        self._task = None
+
+    def record(self, location):
+        """
+        Count a feed request for a location
+
+        Args:
+            location (dict): Location information containing city, region, country, etc.
+        """
+        key = self.feed_service.feed_key(location)
+        if not key[0]:
+            return
+        self.demand[key] += 1
+        self.locations[key] = {
+            field: location[field] for field in ("region", "country", "country_code") if location.get(field)
+        }
+        # Trim the long tail now and then rather than on every request
+        if len(self.demand) > self.max_tracked * 1.1:
+            for rare_key, _ in self.demand.most_common()[self.max_tracked:]:
+                del self.demand[rare_key]
+                self.locations.pop(rare_key, None)
+
+    def top_locations(self):
+        """
+        Return the locations to warm, most requested first, followed by the seed regions
+
+        Returns:
+            list: Location dicts
+        """
+        locations = [self.locations[key] for key, _ in self.demand.most_common(self.top_regions)]
+        keys = {self.feed_service.feed_key(location) for location in locations}
+        for location in self.seed_locations:
+            if self.feed_service.feed_key(location) not in keys:
+                locations.append(location)
+        return locations
+
+    def _decay(self):
+        """Halve every count so yesterday's demand counts less than today's"""
+        for key, count in list(self.demand.items()):
+            if count // 2:
+                self.demand[key] = count // 2
+            else:
+                del self.demand[key]
+                self.locations.pop(key, None)
+
+    def _live_builds(self):
+        return max(0, len(self.feed_service.inflight) - self.warming)
+
+    async def warm(self, force=False):
+        """
+        Warm the feeds of the top locations
+
+        Args:
+            force (bool): Rebuild feeds that are still fresh as well
+
+        Returns:
+            int: Number of feeds built
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm_one(location):
+            async with semaphore:
+                if self._live_builds() >= self.max_live_builds:
+                    logger.info("Skipping pre-warm of %s while live requests are busy", location)
+                    return False
+                self.warming += 1
+                try:
+                    return await self.feed_service.warm(location, force)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Error pre-warming feed for %s: %s", location, e)
+                    return False
+                finally:
+                    self.warming -= 1
+
+        locations = self.top_locations()
+        if not locations:
+            return 0
+        built = sum(await asyncio.gather(*(warm_one(location) for location in locations)))
+        logger.info("Pre-warmed %s of %s regional feeds", built, len(locations))
+        return built
+
+    def _next_scheduled(self, now):
+        """Return the next scheduled warm-up after ``now``, or None if no times are configured"""
+        for day in range(2):
+            date = now.date() + datetime.timedelta(days=day)
+            for at in self.times:
+                scheduled = datetime.datetime.combine(date, at)
+                if scheduled > now:
+                    return scheduled
+        return None
+
+    async def _run(self):
+        # The task runs in its own context, so this only labels the scheduler's log records
+        trace_id.set("prewarm")
+        next_scheduled = self._next_scheduled(datetime.datetime.now())
+        while True:
+            try:
+                if next_scheduled is not None and datetime.datetime.now() >= next_scheduled:
+                    logger.info("Running scheduled pre-warm of the morning headlines")
+                    await self.warm(force=True)
+                    self._decay()
+                    next_scheduled = self._next_scheduled(datetime.datetime.now())
+                else:
+                    await self.warm()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in pre-warm scheduler: %s", e)
+
+            delay = self.interval
+            if next_scheduled is not None:
+                delay = min(delay, (next_scheduled - datetime.datetime.now()).total_seconds())
+            await asyncio.sleep(max(1.0, delay))
+
+    def start(self):
+        """Start the scheduler on the running event loop (called from the app lifespan)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the scheduler; builds it already started are cancelled by ``FeedService.close``"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
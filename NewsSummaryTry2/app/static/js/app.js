@@ -191,10 +191,15 @@ function updateLocationUI(location) {
     document.getElementById("detected-location").textContent = locationText;
 }
 
-// Fetch news articles for the location
+// Fetch news articles for the location, rendering each article as soon as it arrives
 async function fetchNews(location) {
+    // Fall back to the single JSON response where response streams are not supported
+    if (!window.ReadableStream || !window.TextDecoder) {
+        return fetchNewsAll(location);
+    }
+    
     try {
-        const response = await fetch("/api/news", {
+        const response = await fetch("/api/news/stream", {
             method: "POST",
             headers: {
                 "Content-Type": "application/json"
@@ -207,6 +212,83 @@ async function fetchNews(location) {
             throw new Error(errorData.error || "Failed to fetch news");
         }
         
+        if (!response.body) {
+            return fetchNewsAll(location);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let articleCount = 0;
+        let finished = false;
+        
+        // Handle one newline-delimited JSON frame
+        const handleFrame = (line) => {
+            if (!line.trim()) {
+                return;
+            }
+            const frame = JSON.parse(line);
+            if (frame.type === "meta") {
+                clearNews();
+                displaySearchQueries(frame.search_queries);
+            } else if (frame.type === "article") {
+                if (articleCount === 0) {
+                    clearNews();
+                }
+                appendNewsCard(frame.article, articleCount);
+                articleCount++;
+            } else if (frame.type === "done") {
+                finished = true;
+                document.getElementById("loading").style.display = "none";
+                if (articleCount === 0) {
+                    showNoNews();
+                }
+            } else if (frame.type === "error") {
+                finished = true;
+                throw new Error(frame.error || "Failed to fetch news");
+            }
+        };
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split("\n");
+            buffer = lines.pop();
+            lines.forEach(handleFrame);
+        }
+        handleFrame(buffer + decoder.decode());
+        
+        if (!finished) {
+            throw new Error("The news stream ended unexpectedly");
+        }
+    } catch (error) {
+        handleError(`Error fetching news: ${error.message}`);
+    }
+}
+
+// Article fields the news cards use; the rest (content, ai_analysis, ...) is not downloaded
+const ARTICLE_FIELDS = ["title", "summary", "summary_source", "source", "url", "urlToImage", "alternate_sources"];
+
+// Fetch all news articles for the location in a single, HTTP-cacheable response.
+// With cache "no-cache" the browser revalidates its copy and reuses it if the news is unchanged.
+async function fetchNewsAll(location, cache = "default") {
+    try {
+        const params = new URLSearchParams({ fields: ARTICLE_FIELDS.join(",") });
+        ["city", "region", "country", "country_code"].forEach((field) => {
+            if (location[field]) {
+                params.set(field, location[field]);
+            }
+        });
+        const response = await fetch(`/api/news?${params}`, { cache });
+        
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || "Failed to fetch news");
+        }
+        
         const data = await response.json();
         
         // Display news articles
@@ -219,67 +301,98 @@ async function fetchNews(location) {
     }
 }
 
+// Hide the loading indicator and errors and remove the previous news
+function clearNews() {
+    document.getElementById("loading").style.display = "none";
+    document.getElementById("error-message").style.display = "none";
+    document.getElementById("news-container").innerHTML = "";
+}
+
 // Display news articles in the UI
 function displayNews(articles) {
-    const newsContainer = document.getElementById("news-container");
-    const loading = document.getElementById("loading");
-    const errorElement = document.getElementById("error-message");
-    
-    // Hide loading and error
-    loading.style.display = "none";
-    errorElement.style.display = "none";
-    
-    // Clear previous news
-    newsContainer.innerHTML = "";
+    // Hide loading and error, clear previous news
+    clearNews();
     
     if (!articles || articles.length === 0) {
-        errorElement.textContent = "No news articles found for your location.";
-        errorElement.style.display = "block";
+        showNoNews();
         return;
     }
     
+    // Create and append news cards with staggered animation
+    articles.forEach((article, index) => appendNewsCard(article, index));
+}
+
+// Tell the user no articles were found
+function showNoNews() {
+    const errorElement = document.getElementById("error-message");
+    errorElement.textContent = "No news articles found for your location.";
+    errorElement.style.display = "block";
+}
+
+// Create a news card for an article and append it to the news container
+function appendNewsCard(article, index) {
+    const newsContainer = document.getElementById("news-container");
+    
     // Get the template
     const template = document.getElementById("news-card-template");
     
-    // Create and append news cards with staggered animation
-    articles.forEach((article, index) => {
-        // Clone the template
-        const newsCard = document.importNode(template.content, true);
-        
-        // Set the content
-        const image = newsCard.querySelector(".news-image img");
-        const title = newsCard.querySelector(".news-title");
-        const summary = newsCard.querySelector(".news-summary");
-        const source = newsCard.querySelector(".news-source");
-        const readMore = newsCard.querySelector(".read-more");
-        
-        // Set animation order for staggered effect
-        const card = newsCard.querySelector(".news-card");
-        card.style.setProperty('--animation-order', index);
-        
-        // Set image with fallback
-        if (article.urlToImage) {
-            image.src = article.urlToImage;
-            image.alt = article.title;
-        } else {
-            image.src = "/static/img/news-placeholder.jpg";
-            image.alt = "News placeholder image";
-        }
-        
-        // Handle image loading errors
-        image.onerror = function() {
-            this.src = "/static/img/news-placeholder.jpg";
-            this.alt = "News placeholder image";
-        };
-        
-        title.textContent = article.title;
-        summary.textContent = article.summary;
-        source.textContent = article.source;
-        readMore.href = article.url;
-        
-        // Append to container
-        newsContainer.appendChild(newsCard);
-    });
+    // Clone the template
+    const newsCard = document.importNode(template.content, true);
+    
+    // Set the content
+    const image = newsCard.querySelector(".news-image img");
+    const title = newsCard.querySelector(".news-title");
+    const summary = newsCard.querySelector(".news-summary");
+    const source = newsCard.querySelector(".news-source");
+    const readMore = newsCard.querySelector(".read-more");
+    
+    // Set animation order for staggered effect
+    const card = newsCard.querySelector(".news-card");
+    card.style.setProperty('--animation-order', index);
+    
+    // Set image with fallback
+    if (article.urlToImage) {
+        image.src = article.urlToImage;
+        image.alt = article.title;
+    } else {
+        image.src = "/static/img/news-placeholder.jpg";
+        image.alt = "News placeholder image";
+    }
+    
+    // Handle image loading errors
+    image.onerror = function() {
+        this.src = "/static/img/news-placeholder.jpg";
+        this.alt = "News placeholder image";
+    };
+    
+    title.textContent = article.title;
+    summary.textContent = article.summary;
+    if (article.summary_source === "extractive") {
+        summary.title = "Quick summary taken from the article's own sentences";
+    }
+    source.textContent = article.source;
+    readMore.href = article.url;
+    
+    // List other outlets that ran the same story
+    const alternates = newsCard.querySelector(".news-alternates");
+    if (article.alternate_sources && article.alternate_sources.length > 0) {
+        alternates.append("Also reported by: ");
+        article.alternate_sources.forEach((alternate, alternateIndex) => {
+            if (alternateIndex > 0) {
+                alternates.append(", ");
+            }
+            const link = document.createElement("a");
+            link.href = alternate.url;
+            link.target = "_blank";
+            link.textContent = alternate.source;
+            alternates.appendChild(link);
+        });
+    } else {
+        alternates.remove();
+    }
+    
+    // Append to container
+    newsContainer.appendChild(newsCard);
 }
 
 // Handle errors
@@ -321,7 +434,7 @@ function refreshNews() {
             document.getElementById("news-container").innerHTML = "";
             document.getElementById("error-message").style.display = "none";
             
-            fetchNews(locationDetails);
+            fetchNewsAll(locationDetails, "no-cache");
             
             // Reset refresh button after a delay
             setTimeout(() => {
@@ -353,6 +466,13 @@ function displaySearchQueries(queries) {
     endpointItem.innerHTML = `<strong>API Endpoint Used:</strong> ${queries.used_endpoint || "Unknown"}`;
     queryList.appendChild(endpointItem);
     
+    // Say so when the news service was unreachable and saved results are shown
+    if (queries.stale) {
+        const staleItem = document.createElement("li");
+        staleItem.innerHTML = "<strong>Note:</strong> The news service is temporarily unavailable, showing earlier results";
+        queryList.appendChild(staleItem);
+    }
+    
     // Add query terms based on which endpoint was used
     if (queries.used_endpoint === "top-headlines") {
         const queryItem = document.createElement("li");
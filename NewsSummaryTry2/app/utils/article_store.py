@@ -0,0 +1,335 @@
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_ARTICLE_FIELDS = ("url", "title", "description", "content", "urlToImage", "source", "publishedAt")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles ("
+    " hash TEXT PRIMARY KEY,"
+    " url TEXT, title TEXT, description TEXT, content TEXT, url_to_image TEXT, source TEXT,"
+    " published_at TEXT,"
+    " alternate_sources TEXT,"
+    " summary TEXT,"
+    " summary_source TEXT,"
+    " last_seen REAL NOT NULL"
+    ")",
+    "CREATE INDEX IF NOT EXISTS idx_articles_last_seen ON articles (last_seen)",
+    "CREATE TABLE IF NOT EXISTS article_regions ("
+    " hash TEXT NOT NULL,"
+    " region TEXT NOT NULL,"
+    " mentions_region INTEGER NOT NULL,"
+    " relevance_score REAL NOT NULL,"
+    " justification TEXT,"
+    " prompt_version TEXT NOT NULL,"
+    " PRIMARY KEY (hash, region)"
+    ") WITHOUT ROWID",
+    # External-content index: the text lives once, in ``articles``, and triggers keep the index in step
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    " title, description, summary, content='articles', content_rowid='rowid', tokenize='unicode61'"
+    ")",
+    "CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN"
+    " INSERT INTO articles_fts (rowid, title, description, summary)"
+    " VALUES (new.rowid, new.title, new.description, new.summary);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN"
+    " INSERT INTO articles_fts (articles_fts, rowid, title, description, summary)"
+    " VALUES ('delete', old.rowid, old.title, old.description, old.summary);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN"
+    " INSERT INTO articles_fts (articles_fts, rowid, title, description, summary)"
+    " VALUES ('delete', old.rowid, old.title, old.description, old.summary);"
+    " INSERT INTO articles_fts (rowid, title, description, summary)"
+    " VALUES (new.rowid, new.title, new.description, new.summary);"
+    " END"
+)
+
+
+def _score(value):
+    """Return a stored relevance score as the int it usually was"""
+    return int(value) if float(value).is_integer() else value
+
+
+def normalize_region(region):
+    """Return the form a region is stored under: single-spaced and case-folded"""
+    return " ".join((region or "").split()).casefold()
+
+
+class ArticleStore:
+    """
+    Articles seen in earlier feed builds, with their summaries and per-region verdicts
+
+    Articles are kept by URL-and-title hash in a SQLite database (WAL mode, shared by every
+    worker process) with an FTS5 index over title, description and summary. A rebuild
+    looks up each candidate's verdict for the region first, so only articles it has
+    not seen before go through the pre-filter and the LLM. The index also lets a
+    region's feed be served from local data while NewsAPI is unavailable. Writes are
+    buffered and committed in batches, like ``PersistentCache``.
+    """
+
+    def __init__(self, path=None, ttl=None, batch_size=None, flush_interval=None, compact_interval=3600):
+        """
+        Args:
+            path (str): Path to the SQLite database file
+            ttl (float): Seconds an article is kept after it was last seen in NewsAPI results
+            batch_size (int): Number of buffered writes that triggers a commit
+            flush_interval (float): Maximum seconds a buffered write waits before it is committed
+            compact_interval (float): Seconds between automatic removals of old articles
+        """
+        self.path = path or os.getenv("ARTICLE_STORE_PATH", "app/utils/cache/articles.db")
+        self.ttl = ttl if ttl is not None else float(os.getenv("ARTICLE_STORE_TTL", str(7 * 86400)))
+        self.batch_size = batch_size or int(os.getenv("SUMMARY_STORE_BATCH_SIZE", "50"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("SUMMARY_STORE_FLUSH_INTERVAL", "1.0")
+        )
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        # hash -> article row, and (hash, region) -> verdict row, waiting to be committed
+        self._pending_articles = {}
+        self._pending_verdicts = {}
+        self._last_flush = time.monotonic()
+        self._last_compact = time.monotonic()
+        # Commits buffered writes once ``flush_interval`` has passed, even if no further write comes
+        self._flush_timer = None
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    def record(self, article_hash, article, region, analysis, prompt_version):
+        """
+        Buffer an article and its verdict for a region; they are committed with the next batch
+
+        Args:
+            article_hash (str): Hash of the article's URL and title, from ``NewsService._generate_article_hash``
+            article (dict): Normalized article, with ``ai_summary`` and ``summary_source`` if summarized
+            region (str): The state/region the verdict is for
+            analysis (dict): ``mentions_region``, ``relevance_score`` and ``justification``
+            prompt_version (str): Version of the LLM prompts and pre-filter settings that produced the verdict
+        """
+        row = {field: article.get(field) or "" for field in _ARTICLE_FIELDS}
+        row["alternate_sources"] = json.dumps(article.get("alternate_sources") or [])
+        row["summary"] = article.get("ai_summary")
+        row["summary_source"] = article.get("summary_source") if row["summary"] else None
+        row["last_seen"] = time.time()
+        verdict = (
+            1 if analysis.get("mentions_region") else 0,
+            float(analysis.get("relevance_score") or 0),
+            analysis.get("justification"),
+            prompt_version
+        )
+        with self._lock:
+            pending = self._pending_articles.get(article_hash)
+            if pending is not None and pending["summary"] and not row["summary"]:
+                # A verdict for another region without a summary must not drop the one already buffered
+                row["summary"], row["summary_source"] = pending["summary"], pending["summary_source"]
+            self._pending_articles[article_hash] = row
+            self._pending_verdicts[(article_hash, normalize_region(region))] = verdict
+            due = (
+                len(self._pending_articles) + len(self._pending_verdicts) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if not due and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if due:
+            self.flush()
+
+    def get_verdict(self, article_hash, region, prompt_version):
+        """
+        Return what an earlier build decided about an article for a region
+
+        Args:
+            article_hash (str): Hash of the article's URL and title, from ``NewsService._generate_article_hash``
+            region (str): The state/region the verdict is for
+            prompt_version (str): Only verdicts made with this prompt and pre-filter version count
+
+        Returns:
+            dict: ``mentions_region``, ``relevance_score``, ``justification``, ``summary`` and
+                ``summary_source`` (both None if it was never summarized), or None if unknown
+        """
+        key = (article_hash, normalize_region(region))
+        with self._lock:
+            pending = self._pending_articles.get(article_hash)
+            verdict = self._pending_verdicts.get(key)
+            summary = (pending["summary"], pending["summary_source"]) if pending and pending["summary"] else None
+            if verdict is None or summary is None:
+                row = self._conn.execute(
+                    "SELECT a.summary, a.summary_source, r.mentions_region, r.relevance_score,"
+                    " r.justification, r.prompt_version FROM articles a"
+                    " LEFT JOIN article_regions r ON r.hash = a.hash AND r.region = ?"
+                    " WHERE a.hash = ?",
+                    (key[1], article_hash)
+                ).fetchone()
+                if verdict is None:
+                    if row is None or row["prompt_version"] is None:
+                        return None
+                    verdict = (row["mentions_region"], row["relevance_score"], row["justification"], row["prompt_version"])
+                if summary is None:
+                    summary = (row["summary"], row["summary_source"]) if row is not None else (None, None)
+        mentions_region, relevance_score, justification, version = verdict
+        if version != prompt_version:
+            return None
+        return {
+            "mentions_region": bool(mentions_region),
+            "relevance_score": _score(relevance_score),
+            "justification": justification,
+            "summary": summary[0],
+            "summary_source": summary[1]
+        }
+
+    def search_region(self, region, limit=16, min_score=7):
+        """
+        Return recent articles about a region from local data
+
+        Articles an earlier build judged relevant to the region come first; articles never
+        vetted for it but whose title, description or summary name it fill up the rest.
+
+        Args:
+            region (str): The state/region to search for
+            limit (int): Maximum number of articles
+            min_score (int): Lowest relevance score of a vetted article
+
+        Returns:
+            list: Normalized articles, newest first within each group, with ``ai_summary`` and
+                ``summary_source`` when summarized and ``ai_analysis`` when vetted
+        """
+        region = normalize_region(region)
+        if not region:
+            return []
+        self.flush()
+        # Quote the region so FTS5 treats it as a phrase rather than query syntax
+        phrase = '"' + region.replace('"', '""') + '"'
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.*, r.mentions_region, r.relevance_score, r.justification FROM articles a"
+                " LEFT JOIN article_regions r ON r.hash = a.hash AND r.region = ?"
+                " WHERE a.last_seen > ? AND ("
+                "  (r.mentions_region = 1 AND r.relevance_score >= ?)"
+                "  OR (r.hash IS NULL AND a.rowid IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?))"
+                " )"
+                " ORDER BY r.hash IS NULL, a.published_at DESC LIMIT ?",
+                (region, time.time() - self.ttl, min_score, phrase, limit)
+            ).fetchall()
+        articles = []
+        for row in rows:
+            article = {
+                "title": row["title"],
+                "description": row["description"],
+                "content": row["content"],
+                "url": row["url"],
+                "urlToImage": row["url_to_image"],
+                "source": row["source"],
+                "publishedAt": row["published_at"]
+            }
+            alternates = json.loads(row["alternate_sources"] or "[]")
+            if alternates:
+                article["alternate_sources"] = alternates
+            if row["summary"]:
+                article["ai_summary"] = row["summary"]
+                article["summary_source"] = row["summary_source"]
+            if row["mentions_region"] is not None:
+                article["ai_analysis"] = {
+                    "mentions_region": bool(row["mentions_region"]),
+                    "relevance_score": _score(row["relevance_score"]),
+                    "justification": row["justification"]
+                }
+            articles.append(article)
+        return articles
+
+    def flush(self):
+        """Commit all buffered writes in one transaction"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending_articles or self._pending_verdicts:
+                articles = [
+                    (article_hash, row["url"], row["title"], row["description"], row["content"],
+                     row["urlToImage"], row["source"], row["publishedAt"], row["alternate_sources"],
+                     row["summary"], row["summary_source"], row["last_seen"])
+                    for article_hash, row in self._pending_articles.items()
+                ]
+                verdicts = [key + verdict for key, verdict in self._pending_verdicts.items()]
+                try:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    # A summary is never replaced by a missing one, nor an LLM summary by an extractive one
+                    self._conn.executemany(
+                        "INSERT INTO articles (hash, url, title, description, content, url_to_image, source,"
+                        " published_at, alternate_sources, summary, summary_source, last_seen)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (hash) DO UPDATE SET"
+                        " alternate_sources = excluded.alternate_sources,"
+                        " last_seen = excluded.last_seen,"
+                        " summary = CASE WHEN excluded.summary IS NOT NULL AND (summary IS NULL"
+                        "  OR summary_source != 'llm' OR excluded.summary_source = 'llm')"
+                        "  THEN excluded.summary ELSE summary END,"
+                        " summary_source = CASE WHEN excluded.summary IS NOT NULL AND (summary IS NULL"
+                        "  OR summary_source != 'llm' OR excluded.summary_source = 'llm')"
+                        "  THEN excluded.summary_source ELSE summary_source END",
+                        articles
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO article_regions (hash, region, mentions_region, relevance_score,"
+                        " justification, prompt_version) VALUES (?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (hash, region) DO UPDATE SET"
+                        " mentions_region = excluded.mentions_region,"
+                        " relevance_score = excluded.relevance_score,"
+                        " justification = excluded.justification,"
+                        " prompt_version = excluded.prompt_version",
+                        verdicts
+                    )
+                    self._conn.execute("COMMIT")
+                    self._pending_articles.clear()
+                    self._pending_verdicts.clear()
+                except sqlite3.Error as e:
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                    logger.warning("Error writing article store: %s", e)
+            self._last_flush = time.monotonic()
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def compact(self):
+        """
+        Delete articles (and their verdicts) not seen for ``ttl`` seconds
+
+        Returns:
+            int: Number of articles removed
+        """
+        with self._lock:
+            self._last_compact = time.monotonic()
+            try:
+                cutoff = time.time() - self.ttl
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "DELETE FROM article_regions WHERE hash IN (SELECT hash FROM articles WHERE last_seen <= ?)",
+                    (cutoff,)
+                )
+                removed = self._conn.execute("DELETE FROM articles WHERE last_seen <= ?", (cutoff,)).rowcount
+                self._conn.execute("COMMIT")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                return removed
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.warning("Error compacting article store: %s", e)
+                return 0
+
+    def close(self):
+        """Commit buffered writes and close the database"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,291 @@
+import os
+import logging
+import json
+import time
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentCache:
+    """
+    Key/value cache in a SQLite database that every worker process can share
+
+    The database runs in WAL mode, so readers never block the single writer and
+    several ``uvicorn`` workers can use the same file. Writes are buffered and
+    committed in batches, by a timer thread at the latest ``flush_interval`` seconds
+    after the first buffered write, so other workers see them even if this one goes
+    idle. Expired rows are found through an index on ``expires_at`` and removed by
+    ``compact``. Values are stored as JSON.
+    """
+
+    def __init__(self, path, namespace, ttl=86400, batch_size=50, flush_interval=1.0, compact_interval=3600):
+        """
+        Args:
+            path (str): Path to the SQLite database file
+            namespace (str): Name that keeps this cache's keys apart from other caches in the file
+            ttl (float): Default time to live in seconds
+            batch_size (int): Number of buffered writes that triggers a commit
+            flush_interval (float): Maximum seconds a buffered write waits before it is committed
+            compact_interval (float): Seconds between automatic removals of expired rows
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        # key -> (json value, expires_at) waiting to be committed
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._last_compact = time.monotonic()
+        # Commits buffered writes once ``flush_interval`` has passed, even if no further write comes
+        self._flush_timer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry ON cache_entries (expires_at)")
+
+    def get(self, key):
+        """
+        Return the cached value for ``key``, or None if it is missing or expired
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            The decoded value or None
+        """
+        now = time.time()
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                value, expires_at = pending
+            else:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                value, expires_at = row
+        if expires_at <= now:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """
+        Buffer a value for writing; it is committed with the next batch
+
+        Args:
+            key (str): The cache key
+            value: Any JSON-serializable value
+            ttl (float): Time to live in seconds, overriding the default
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._pending[key] = (json.dumps(value), expires_at)
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if not due and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Commit all buffered writes in one transaction"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending:
+                rows = [
+                    (self.namespace, key, value, expires_at)
+                    for key, (value, expires_at) in self._pending.items()
+                ]
+                try:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._conn.executemany(
+                        "INSERT INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                        rows
+                    )
+                    self._conn.execute("COMMIT")
+                    self._pending.clear()
+                except sqlite3.Error as e:
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                    logger.warning("Error writing %s cache: %s", self.namespace, e)
+            self._last_flush = time.monotonic()
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def load_recent(self, limit):
+        """
+        Return the most recently written unexpired entries, for warming an in-memory cache
+
+        Args:
+            limit (int): Maximum number of entries to return
+
+        Returns:
+            list: ``(key, value)`` pairs, newest first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM cache_entries WHERE namespace = ? AND expires_at > ? "
+                "ORDER BY expires_at DESC LIMIT ?",
+                (self.namespace, time.time(), limit)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def compact(self):
+        """
+        Delete expired rows and truncate the write-ahead log
+
+        Returns:
+            int: Number of rows removed
+        """
+        with self._lock:
+            self._last_compact = time.monotonic()
+            try:
+                removed = self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+                    (self.namespace, time.time())
+                ).rowcount
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                return removed
+            except sqlite3.Error as e:
+                logger.warning("Error compacting %s cache: %s", self.namespace, e)
+                return 0
+
+    def close(self):
+        """Commit buffered writes and close the database"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+class SummaryCache(PersistentCache):
+    """Utility for caching article summaries to minimize OpenAI API calls"""
+
+    def __init__(self, path=None, ttl=None):
+        """Initialize the cache in a SQLite file shared by every worker process"""
+        super().__init__(
+            path or os.getenv("SUMMARY_STORE_PATH", "app/utils/cache/summaries.db"),
+            namespace="summary",
+            ttl=ttl if ttl is not None else float(os.getenv("SUMMARY_CACHE_TTL", "86400")),
+            batch_size=int(os.getenv("SUMMARY_STORE_BATCH_SIZE", "50")),
+            flush_interval=float(os.getenv("SUMMARY_STORE_FLUSH_INTERVAL", "1.0"))
+        )
+
+    def get_cached_summary(self, article_hash):
+        """
+        Retrieve a cached summary if available and not expired
+
+        Args:
+            article_hash (str): Hash of the article to check for in cache
+
+        Returns:
+            str or None: Cached summary if available, None otherwise
+        """
+        return self.get(article_hash)
+
+    def cache_summary(self, article_hash, summary):
+        """
+        Store a summary in the cache
+
+        Args:
+            article_hash (str): Hash of the article
+            summary (str): Generated summary text
+        """
+        self.set(article_hash, summary)
+
+
+class VerdictCache(PersistentCache):
+    """Utility for caching region relevance verdicts so other workers can reuse them"""
+
+    def __init__(self, path=None, ttl=None):
+        """Initialize the cache in the same SQLite file as the summaries"""
+        super().__init__(
+            path or os.getenv("SUMMARY_STORE_PATH", "app/utils/cache/summaries.db"),
+            namespace="verdict",
+            ttl=ttl if ttl is not None else float(os.getenv("VERDICT_CACHE_TTL", "86400")),
+            batch_size=int(os.getenv("SUMMARY_STORE_BATCH_SIZE", "50")),
+            flush_interval=float(os.getenv("SUMMARY_STORE_FLUSH_INTERVAL", "1.0"))
+        )
+
+    def get_cached_verdict(self, verdict_key):
+        """
+        Retrieve a cached verdict if available and not expired
+
+        Args:
+            verdict_key (str): Key built from the article hash, region and prompt version
+
+        Returns:
+            dict or None: The cached verdict if available, None otherwise
+        """
+        return self.get(verdict_key)
+
+    def cache_verdict(self, verdict_key, verdict):
+        """
+        Store a verdict in the cache
+
+        Args:
+            verdict_key (str): Key built from the article hash, region and prompt version
+            verdict (dict): ``mentions_region``, ``relevance_score`` and ``justification``
+        """
+        self.set(verdict_key, verdict)
+
+
+class GeocodeCache(PersistentCache):
+    """Utility for caching reverse geocoding results per quantized grid cell"""
+
+    def __init__(self, path=None, ttl=None):
+        """Initialize the cache in a SQLite file shared by every worker process"""
+        super().__init__(
+            path or os.getenv("GEOCODE_STORE_PATH", "app/utils/cache/geocode.db"),
+            namespace="geocode",
+            ttl=ttl if ttl is not None else float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 86400))),
+            batch_size=1
+        )
+
+    def get_cached_location(self, cell):
+        """
+        Retrieve a cached location if available and not expired
+
+        Args:
+            cell (str): Key of the quantized grid cell
+
+        Returns:
+            dict or None: The cached location if available, None otherwise
+        """
+        return self.get(cell)
+
+    def cache_location(self, cell, location):
+        """
+        Store a location in the cache
+
+        Args:
+            cell (str): Key of the quantized grid cell
+            location (dict): Location information including city, region, country
+        """
+        self.set(cell, location)
@@ -0,0 +1,162 @@
+import math
+
+from app.utils.text_utils import clean_text, is_truncated, split_sentences as split_text, strip_source_suffix, words
+
+SOURCE_LLM = "llm"
+SOURCE_EXTRACTIVE = "extractive"
+
+# Common English function words; they carry no topic and would make every sentence look alike
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before
+being below between both but by can can't could couldn't did didn't do does doesn't doing don't down
+during each few for from further had hadn't has hasn't have haven't having he he'd he'll he's her here
+here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself
+just let's me more most mustn't my myself new no nor not now of off on once only or other ought our ours
+ourselves out over own said same say says she she'd she'll she's should shouldn't so some such than that
+that's the their theirs them themselves then there there's these they they'd they'll they're they've
+this those through to too under until up very was wasn't we we'd we'll we're we've were weren't what
+what's when when's where where's which while who who's whom why why's will with won't would wouldn't
+year years you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+# Damping factor and iterations of the TextRank power iteration
+_DAMPING = 0.85
+_ITERATIONS = 30
+# Sentences shorter than this are headings, bylines or fragments rather than content
+_MIN_WORDS = 5
+
+
+def _terms(text):
+    """Return the content words of a text, lowercased, without stopwords or plural ``s``"""
+    terms = []
+    for word in words(text):
+        if word in _STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def split_sentences(article):
+    """
+    Return the distinct sentences of an article's description and content, in order
+
+    Content usually repeats the description and is cut off by NewsAPI, so repeated
+    sentences and a trailing cut-off sentence are dropped.
+
+    Args:
+        article (dict): Article containing title, description, and content
+
+    Returns:
+        list: Sentences
+    """
+    sentences = []
+    seen = set()
+    for field in ("description", "content"):
+        text = article.get(field) or ""
+        truncated = is_truncated(text)
+        parts = split_text(clean_text(text))
+        if truncated and len(parts) > 1 and not parts[-1].endswith((".", "!", "?", '"', "'")):
+            parts.pop()
+        for part in parts:
+            key = " ".join(_terms(part))
+            if len(part.split()) < _MIN_WORDS or not key or key in seen:
+                continue
+            seen.add(key)
+            sentences.append(part)
+    return sentences
+
+
+def _tfidf_vectors(sentence_terms):
+    """Weight every sentence's terms by TF-IDF, with document frequencies taken over the sentences"""
+    count = len(sentence_terms)
+    document_frequency = {}
+    for terms in sentence_terms:
+        for term in set(terms):
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    vectors = []
+    for terms in sentence_terms:
+        vector = {}
+        for term in terms:
+            vector[term] = vector.get(term, 0) + 1
+        for term, frequency in vector.items():
+            vector[term] = (1 + math.log(frequency)) * math.log(1 + count / document_frequency[term])
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def _textrank(vectors):
+    """Rank sentences by how central they are in the graph of their pairwise similarities"""
+    count = len(vectors)
+    weights = [[_cosine(vectors[i], vectors[j]) if i != j else 0.0 for j in range(count)] for i in range(count)]
+    totals = [sum(row) for row in weights]
+    scores = [1.0 / count] * count
+    for _ in range(_ITERATIONS):
+        scores = [
+            (1 - _DAMPING) / count + _DAMPING * sum(
+                weights[j][i] / totals[j] * scores[j] for j in range(count) if totals[j]
+            )
+            for i in range(count)
+        ]
+    return scores
+
+
+def summarize(article, max_sentences=2, max_words=60):
+    """
+    Summarize an article by picking its most representative sentences
+
+    Sentences are scored by TextRank over TF-IDF similarity, plus their overlap with the
+    title and a small bonus for coming early (news is written lead first). The best
+    sentences that fit the word budget are returned in their original order. Needs no
+    network and takes about a millisecond for a NewsAPI article.
+
+    Args:
+        article (dict): Article containing title, description, and content
+        max_sentences (int): Most sentences to pick
+        max_words (int): Most words in the summary
+
+    Returns:
+        str: The summary; the title (without outlet suffix) if the article has no usable text
+    """
+    title = strip_source_suffix(article.get("title"))
+    sentences = split_sentences(article)
+    if not sentences:
+        return title or "Summary unavailable."
+    if len(sentences) == 1:
+        return _cut_words(sentences[0], max_words)
+
+    sentence_terms = [_terms(sentence) for sentence in sentences]
+    ranks = _textrank(_tfidf_vectors(sentence_terms))
+    title_terms = set(_terms(title))
+    scores = []
+    for index, (terms, rank) in enumerate(zip(sentence_terms, ranks)):
+        title_overlap = len(title_terms.intersection(terms)) / len(title_terms) if title_terms else 0.0
+        position = 1.0 / (1 + index)
+        scores.append(rank * len(sentences) + 0.5 * title_overlap + 0.3 * position)
+
+    chosen = []
+    words = 0
+    for index in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        length = len(sentences[index].split())
+        if chosen and words + length > max_words:
+            continue
+        chosen.append(index)
+        words += length
+        if len(chosen) >= max_sentences:
+            break
+    return _cut_words(" ".join(sentences[index] for index in sorted(chosen)), max_words)
+
+
+def _cut_words(text, max_words):
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words]).rstrip(" ,;:") + "…"
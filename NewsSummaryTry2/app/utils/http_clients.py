@@ -0,0 +1,104 @@
+import os
+import httpx
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from app.utils.resilience import CircuitBreaker, TokenBucket, UpstreamPolicy
+
+# Load environment variables
+load_dotenv()
+
+
+def _setting(prefix, name, default, cast=float):
+    """
+    Read a client setting, preferring the upstream-specific variable over the global one
+
+    For example ``_setting("NEWSAPI", "TIMEOUT", 10)`` reads ``NEWSAPI_TIMEOUT``,
+    then ``HTTP_TIMEOUT``, then falls back to ``10``.
+    """
+    for key in (f"{prefix}_{name}" if prefix else None, f"HTTP_{name}"):
+        if key and os.getenv(key):
+            return cast(os.getenv(key))
+    return default
+
+
+def create_http_client(prefix=None):
+    """
+    Create a pooled, keep-alive ``httpx.AsyncClient`` for one upstream
+
+    Args:
+        prefix (str): Optional environment variable prefix for per-upstream overrides
+
+    Returns:
+        httpx.AsyncClient: A client that should be shared and closed on shutdown
+    """
+    limits = httpx.Limits(
+        max_connections=_setting(prefix, "MAX_CONNECTIONS", 100, int),
+        max_keepalive_connections=_setting(prefix, "MAX_KEEPALIVE_CONNECTIONS", 20, int),
+        keepalive_expiry=_setting(prefix, "KEEPALIVE_EXPIRY", 30.0),
+    )
+    timeout = httpx.Timeout(
+        _setting(prefix, "TIMEOUT", 10.0),
+        connect=_setting(prefix, "CONNECT_TIMEOUT", 5.0),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def create_openai_client():
+    """
+    Create an ``AsyncOpenAI`` client backed by its own pooled HTTP client
+
+    Returns:
+        AsyncOpenAI: The shared OpenAI client
+    """
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        # None uses the official endpoint
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        http_client=create_http_client("OPENAI"),
+        timeout=_setting("OPENAI", "TIMEOUT", 30.0),
+        # Retries are handled by the OpenAI upstream policy
+        max_retries=0,
+    )
+
+
+def create_upstream_policy(prefix, rate_limit=None, burst=None):
+    """
+    Create the rate limiter, retry and circuit breaker policy for one upstream
+
+    Args:
+        prefix (str): Environment variable prefix for per-upstream overrides
+        rate_limit (float): Default sustained requests per second, or None for no limit
+        burst (int): Default requests allowed back to back
+
+    Returns:
+        UpstreamPolicy: A policy that should be shared by every call to the upstream
+    """
+    rate = _setting(prefix, "RATE_LIMIT", rate_limit or 0)
+    return UpstreamPolicy(
+        prefix,
+        rate_limiter=TokenBucket(rate, _setting(prefix, "RATE_BURST", burst or 0, int)) if rate else None,
+        breaker=CircuitBreaker(
+            failure_threshold=_setting(prefix, "BREAKER_THRESHOLD", 5, int),
+            reset_timeout=_setting(prefix, "BREAKER_RESET", 30.0),
+        ),
+        max_retries=_setting(prefix, "MAX_RETRIES", 2, int),
+        base_delay=_setting(prefix, "RETRY_BASE_DELAY", 0.2),
+        max_delay=_setting(prefix, "RETRY_MAX_DELAY", 2.0),
+        max_wait=_setting(prefix, "RATE_LIMIT_MAX_WAIT", 5.0),
+    )
+
+
+class UpstreamClients:
+    """One shared client per upstream, created once for the lifetime of the app"""
+
+    def __init__(self):
+        self.geocoding = create_http_client("GEOCODING")
+        self.newsapi = create_http_client("NEWSAPI")
+        self.openai = create_openai_client()
+
+    async def aclose(self):
+        """Close every pooled connection"""
+        await self.geocoding.aclose()
+        await self.newsapi.aclose()
+        await self.openai.close()
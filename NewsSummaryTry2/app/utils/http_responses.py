@@ -0,0 +1,214 @@
+import gzip
+import hashlib
+import json
+import logging
+
+from starlette.responses import Response
+
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    # Optional; without it responses are only gzip-compressed
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Bodies smaller than this gain too little from compression to be worth it
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Compressed bodies by (etag, encoding), so unchanged feeds are compressed once
+_compressed = LRUCache(max_entries=128, max_bytes=8 * 1024 * 1024)
+
+
+def dumps(payload):
+    """
+    Serialize a payload to compact UTF-8 JSON, with orjson when it is installed
+
+    Args:
+        payload: JSON-serializable value
+
+    Returns:
+        bytes: The encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the standard library can still encode
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(payload, status_code=200, headers=None):
+    """Return a JSON response serialized with ``dumps``"""
+    return Response(dumps(payload), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def parse_fields(value):
+    """
+    Parse a comma-separated field list from a query parameter
+
+    Args:
+        value (str): e.g. ``"title,summary,url"``, or None
+
+    Returns:
+        tuple: The field names in order, or None to keep every field
+    """
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+    return fields or None
+
+
+def project(items, fields):
+    """
+    Keep only the given fields of each dict, leaving the originals untouched
+
+    Args:
+        items (list): Dicts such as articles
+        fields (tuple): Field names to keep, or None to keep every field
+
+    Returns:
+        list: The projected dicts
+    """
+    if fields is None:
+        return items
+    return [{field: item[field] for field in fields if field in item} for item in items]
+
+
+def make_etag(body):
+    """Return a weak entity tag for a response body"""
+    return 'W/"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an ``If-None-Match`` header matches an entity tag, by weak comparison
+
+    Args:
+        if_none_match (str): The request header, a list of entity tags or ``*``
+        etag (str): The current entity tag
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content coding for a response from the ``Accept-Encoding`` header
+
+    Brotli is preferred when the ``brotli`` package is installed, then gzip.
+    Codings the client gives a quality of zero are never used.
+
+    Args:
+        accept_encoding (str): The request header
+
+    Returns:
+        str: ``"br"``, ``"gzip"`` or None for the identity coding
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def quality_of(coding):
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=quality_of)
+    return best if quality_of(best) > 0 else None
+
+
+def compress(body, encoding, etag=None):
+    """
+    Compress a body with the given coding, reusing earlier results for the same entity tag
+
+    Args:
+        body (bytes): The response body
+        encoding (str): ``"br"`` or ``"gzip"``
+        etag (str): Entity tag of the body, used as the cache key when given
+
+    Returns:
+        bytes: The compressed body
+    """
+    key = (etag, encoding)
+    if etag is not None:
+        cached = _compressed.get(key)
+        if cached is not None:
+            return cached
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        # mtime=0 keeps the output, and so any proxy cache entry, stable for a body
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if etag is not None:
+        _compressed.put(key, compressed)
+    return compressed
+
+
+def cached_json_response(request, payload, max_age=60):
+    """
+    Return a JSON response that browsers and proxies can cache and revalidate
+
+    The response carries a weak ETag over the serialized body and answers
+    ``If-None-Match`` with ``304 Not Modified``. Bodies of at least
+    ``MIN_COMPRESS_BYTES`` are compressed with the best coding the client accepts.
+
+    Args:
+        request (Request): The incoming request
+        payload: JSON-serializable value
+        max_age (int): Seconds the client may reuse the response without revalidating
+
+    Returns:
+        Response: The JSON response, or an empty 304 response
+    """
+    body = dumps(payload)
+    etag = make_etag(body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(max_age)}",
+        "Vary": "Accept-Encoding"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding is not None:
+        compressed = compress(body, encoding, etag)
+        logger.debug("Compressed %s bytes to %s with %s", len(body), len(compressed), encoding)
+        body = compressed
+        headers["Content-Encoding"] = encoding
+    return Response(body, headers=headers, media_type=JSON_MEDIA_TYPE)
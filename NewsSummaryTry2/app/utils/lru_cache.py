@@ -0,0 +1,153 @@
+import sys
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """
+    Roughly estimate how many bytes a cached value occupies
+
+    Strings and bytes are measured by length, containers are measured recursively,
+    and anything else falls back to ``sys.getsizeof``.
+    """
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with per-entry TTL and hit/miss metrics
+
+    Both ``get`` and ``put`` are O(1). Entries are evicted least recently used first
+    whenever the cache holds more than ``max_entries`` entries or more than
+    ``max_bytes`` bytes (as measured by ``sizeof``). Expired entries are dropped
+    lazily when they are read or reach the cold end of the cache.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=None, ttl=None, sizeof=estimate_size):
+        """
+        Args:
+            max_entries (int): Maximum number of entries
+            max_bytes (int): Optional memory cap in bytes
+            ttl (float): Default time to live in seconds, or None for no expiry
+            sizeof (callable): Function returning the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        # key -> (value, expires_at, size)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        Return the value for ``key`` and mark it as recently used
+
+        Args:
+            key: The cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value, or ``default``
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, ttl=None):
+        """
+        Store a value, evicting least recently used entries if the cache is over its limits
+
+        Args:
+            key: The cache key
+            value: The value to store
+            ttl (float): Time to live in seconds for this entry, overriding the default
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never cache a single value larger than the whole cache
+            return
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        self._evict()
+
+    def pop(self, key, default=None):
+        """Remove ``key`` and return its value (expired or not), or ``default``"""
+        if key not in self._entries:
+            return default
+        value = self._entries[key][0]
+        self._remove(key)
+        return value
+
+    def clear(self):
+        """Remove every entry; the counters are kept"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        Return the cache counters
+
+        Returns:
+            dict: entries, bytes, hits, misses, evictions, expirations and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, (_, expires_at, _) = next(iter(self._entries.items()))
+            self._remove(key)
+            if expires_at is not None and expires_at <= now:
+                self.expirations += 1
+            else:
+                self.evictions += 1
@@ -0,0 +1,188 @@
+import time
+import bisect
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a cache hit to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # label values -> count
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def render(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(round(total, 6))}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """
+    The metrics of the process, rendered in the Prometheus text exposition format
+
+    Besides counters and histograms updated as things happen, collectors are called
+    at scrape time to report values that are already tracked elsewhere (such as the
+    cache hit counters), so nothing on the hot path has to be updated twice.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Add a function called at scrape time
+
+        Args:
+            collector (callable): Returns an iterable of ``(name, kind, documentation, labels, value)``
+                where ``kind`` is ``counter`` or ``gauge`` and ``labels`` is a dict
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """
+        Render every metric
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        collected = {}
+        for collector in self._collectors:
+            try:
+                for name, kind, documentation, labels, value in collector():
+                    collected.setdefault(name, (kind, documentation, []))[2].append((labels, value))
+            except Exception as e:
+                logger.warning("Metrics collector failed: %s", e)
+        for name, (kind, documentation, samples) in collected.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_duration_seconds", "Time spent in each pipeline stage", ["stage"]
+)
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "OpenAI chat completion calls by kind and outcome", ["kind", "outcome"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens used by OpenAI chat completions, as reported by the API", ["type"]
+)
+SUMMARIES = REGISTRY.counter(
+    "summaries_total", "Article summaries written, by source (llm or extractive)", ["source"]
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response headers were sent", ["method", "route", "status"]
+)
+
+
+@contextmanager
+def span(stage):
+    """
+    Time a block of code as one pipeline stage
+
+    The duration is added to ``pipeline_stage_duration_seconds`` and logged at debug
+    level with the current trace ID, whether the block finishes or raises.
+
+    Args:
+        stage (str): Stage name, e.g. ``geocode`` or ``newsapi_fetch``
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        logger.debug("span %s took %.1f ms", stage, elapsed * 1000)
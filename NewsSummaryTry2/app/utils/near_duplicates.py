@@ -0,0 +1,109 @@
+import random
+import hashlib
+
+from app.utils.text_utils import strip_source_suffix, words as text_words
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their this to was were will with".split()
+)
+
+
+def article_text(article):
+    """Return the text an article is compared on: title without the outlet suffix, plus description"""
+    title = strip_source_suffix(article.get("title"))
+    return f"{title} {article.get('description') or ''}"
+
+
+def shingles(text):
+    """
+    Split text into word unigrams and bigrams, ignoring case, punctuation and stopwords
+
+    Args:
+        text (str): Title and description of an article
+
+    Returns:
+        set: The shingles
+    """
+    words = [word for word in text_words(text) if word not in _STOPWORDS]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def jaccard(a, b):
+    """Return the Jaccard similarity of two shingle sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Clusters near-duplicate texts with MinHash signatures and locality-sensitive hashing
+
+    Each text's shingle set gets a ``bands * rows`` value MinHash signature. Texts are
+    only compared when they agree on every value of at least one band, so adding a
+    text costs time proportional to its own size rather than to the number of texts
+    already indexed. Candidate pairs are confirmed with their exact Jaccard
+    similarity. The first text of a cluster is its representative.
+    """
+
+    def __init__(self, threshold=0.5, bands=16, rows=4, seed=1):
+        """
+        Args:
+            threshold (float): Smallest Jaccard similarity of shingles treated as a duplicate
+            bands (int): Number of LSH bands; with ``rows`` this sets which pairs get compared
+            rows (int): Signature values per band
+            seed (int): Seed for the hash permutations, so signatures are stable across runs
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        # Each signature value is the minimum of the shingle hashes XORed with one random mask
+        self._masks = [rng.getrandbits(64) for _ in range(bands * rows)]
+        # (band number, band values) -> entries of representatives with that band
+        self._buckets = {}
+
+    def signature(self, shingle_set):
+        """Return the MinHash signature of a shingle set"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in shingle_set
+        ]
+        if not hashes:
+            return ()
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+    def _band_keys(self, signature):
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)
+        ]
+
+    def find_or_add(self, text, item):
+        """
+        Return the representative of the cluster ``text`` belongs to, or register ``item`` as a new one
+
+        Args:
+            text (str): Text to compare
+            item: Value returned for later near-duplicates of this text
+
+        Returns:
+            The representative item of an existing cluster, or None if ``item`` starts a new cluster
+        """
+        shingle_set = shingles(text)
+        signature = self.signature(shingle_set)
+        if not signature:
+            # Nothing to compare on; never merge empty texts
+            return None
+        band_keys = self._band_keys(signature)
+        checked = set()
+        for band_key in band_keys:
+            for entry in self._buckets.get(band_key, ()):
+                if id(entry) in checked:
+                    continue
+                checked.add(id(entry))
+                if jaccard(shingle_set, entry[0]) >= self.threshold:
+                    return entry[1]
+        entry = (shingle_set, item)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(entry)
+        return None
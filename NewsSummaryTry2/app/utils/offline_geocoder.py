@@ -0,0 +1,178 @@
+import os
+import logging
+import csv
+import math
+import mmap
+import struct
+import hashlib
+from array import array
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Index file layout: header, then 4 doubles (x, y, z, place index) per node
+_HEADER = struct.Struct("<4sI20s4x")
+_MAGIC = b"KDT1"
+_NODE_WIDTH = 4
+
+
+def _to_unit_vector(latitude, longitude):
+    """Convert degrees to a point on the unit sphere so straight-line distance orders like great-circle distance"""
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lng), cos_lat * math.sin(lng), math.sin(lat)
+
+
+class OfflineGeocoder:
+    """
+    Reverse geocoder that finds the nearest city in a bundled gazetteer
+
+    City centroids are placed on the unit sphere and stored as an implicit k-d
+    tree: a flat array where every subrange's median is the splitting node.
+    The array is written to disk once and memory-mapped on later starts, so
+    loading is only a header check. Lookups take microseconds and need no
+    network access.
+    """
+
+    def __init__(self, gazetteer_path=None, countries_path=None, index_path=None):
+        """
+        Args:
+            gazetteer_path (str): CSV of ``name,latitude,longitude,admin1,country_code``
+            countries_path (str): CSV of ``country_code,name``
+            index_path (str): Where the built k-d tree is stored and memory-mapped from
+        """
+        self.gazetteer_path = gazetteer_path or os.getenv("GAZETTEER_PATH", "app/data/gazetteer.csv")
+        self.countries_path = countries_path or os.getenv("GAZETTEER_COUNTRIES_PATH", "app/data/countries.csv")
+        self.index_path = index_path or os.getenv("GAZETTEER_INDEX_PATH", "app/utils/cache/gazetteer.kdtree")
+
+        with open(self.gazetteer_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).digest()
+        rows = list(csv.DictReader(raw.decode("utf-8").splitlines()))
+        self.places = [(row["name"], row["admin1"], row["country_code"]) for row in rows]
+
+        with open(self.countries_path, encoding="utf-8") as f:
+            self.countries = {row["country_code"]: row["name"] for row in csv.DictReader(f)}
+
+        self._mmap = None
+        self._tree = self._load_index(digest)
+        if self._tree is None:
+            nodes = self._build_tree(rows)
+            self._save_index(nodes, digest)
+            self._tree = self._load_index(digest) or memoryview(nodes)
+
+    def __len__(self):
+        return len(self.places)
+
+    def reverse(self, latitude, longitude):
+        """
+        Find the nearest gazetteer city to a coordinate
+
+        Args:
+            latitude (float): The latitude coordinate
+            longitude (float): The longitude coordinate
+
+        Returns:
+            tuple: ``(location, distance_km)`` where location has the same shape as
+                ``GeocodingService`` results, or ``(None, inf)`` if the gazetteer is empty
+        """
+        if not self.places:
+            return None, math.inf
+        place_index, chord_squared = self._nearest(*_to_unit_vector(latitude, longitude))
+        chord = math.sqrt(chord_squared)
+        distance_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+        name, admin1, country_code = self.places[place_index]
+        country = self.countries.get(country_code, country_code)
+        parts = []
+        for part in (name, admin1, country):
+            if part and part not in parts:
+                parts.append(part)
+        location = {
+            "city": name,
+            "region": admin1 or None,
+            "country": country,
+            "country_code": country_code,
+            "formatted_address": ", ".join(parts)
+        }
+        return location, distance_km
+
+    def _nearest(self, x, y, z):
+        tree = self._tree
+        target = (x, y, z)
+        best_distance = math.inf
+        best_index = -1
+        # Depth-first search; each entry is (lo, hi, depth, lower bound on squared distance)
+        stack = [(0, len(self.places), 0, 0.0)]
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if lo >= hi or bound >= best_distance:
+                continue
+            mid = (lo + hi) // 2
+            base = mid * _NODE_WIDTH
+            dx = tree[base] - x
+            dy = tree[base + 1] - y
+            dz = tree[base + 2] - z
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < best_distance:
+                best_distance = distance
+                best_index = int(tree[base + 3])
+            axis = depth % 3
+            diff = target[axis] - tree[base + axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # Push the far side first so the near side is searched first
+            stack.append((far[0], far[1], depth + 1, diff * diff))
+            stack.append((near[0], near[1], depth + 1, bound))
+        return best_index, best_distance
+
+    @staticmethod
+    def _build_tree(rows):
+        points = [
+            _to_unit_vector(float(row["latitude"]), float(row["longitude"])) + (float(index),)
+            for index, row in enumerate(rows)
+        ]
+
+        def build(lo, hi, depth):
+            if hi - lo <= 1:
+                return
+            axis = depth % 3
+            points[lo:hi] = sorted(points[lo:hi], key=lambda point: point[axis])
+            mid = (lo + hi) // 2
+            build(lo, mid, depth + 1)
+            build(mid + 1, hi, depth + 1)
+
+        build(0, len(points), 0)
+        return array("d", [value for point in points for value in point])
+
+    def _save_index(self, nodes, digest):
+        try:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(nodes) // _NODE_WIDTH, digest))
+                f.write(nodes.tobytes())
+            # Atomic so other workers never map a half-written file
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning("Could not save gazetteer index, keeping it in memory: %s", e)
+
+    def _load_index(self, digest):
+        try:
+            with open(self.index_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, count, stored_digest = _HEADER.unpack_from(mapped)
+        expected_size = _HEADER.size + count * _NODE_WIDTH * 8
+        if magic != _MAGIC or stored_digest != digest or count != len(self.places) or len(mapped) != expected_size:
+            mapped.close()
+            return None
+        self._mmap = mapped
+        return memoryview(mapped)[_HEADER.size:].cast("d")
@@ -0,0 +1,226 @@
+import os
+import logging
+import json
+import hashlib
+
+from app.utils.text_utils import clean_text, split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Budgets for the article fields sent to the model, in tokens
+DESCRIPTION_TOKENS = int(os.getenv("PROMPT_DESCRIPTION_TOKENS", "120"))
+CONTENT_TOKENS = int(os.getenv("PROMPT_CONTENT_TOKENS", "250"))
+TOKENIZER_MODEL = os.getenv("PROMPT_TOKENIZER_MODEL", "gpt-3.5-turbo")
+
+# The instruction blocks never mention the article or region, so every call starts
+# with the same prefix; the article and region go in the user message
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a helpful assistant that summarizes news articles in a clear, direct manner without using "
+    "introductory phrases, greetings, or meta-references to the article itself. Provide only the essential "
+    "information. Summarize the news article you are given in 2-3 concise sentences. Do not use any "
+    "introductory phrases like 'Hey there', 'Did you know', or greetings. Do not repeat the title or start "
+    "with phrases like 'Title:' or 'This article:'. Start directly with the summary content."
+)
+
+_RELEVANCE_CRITERIA = """Apply STRICT criteria for relevance:
+- The {subject} must EXPLICITLY mention the target state/region by name OR
+- The {subject} must discuss events, policies, or issues that DIRECTLY and SPECIFICALLY impact the target state/region (not just general news that might affect many regions)
+- Articles about nearby regions or general national news should NOT be considered relevant unless they specifically discuss impacts on the target state/region"""
+
+_VERDICT_FIELDS = """"mentions_region": true|false,
+    "relevance_score": 0-10 (where 0 means completely irrelevant and 10 means directly about this region),
+    "justification": "Brief explanation of why this article is or is not relevant to the region\""""
+
+CLASSIFY_SYSTEM_PROMPT = f"""Summarize the news article you are given in 2-3 sentences. Then determine if the target state/region is EXPLICITLY mentioned or DIRECTLY relevant to the article content.
+
+{_RELEVANCE_CRITERIA.format(subject="article")}
+
+Respond with a JSON object with this format: {{
+    "summary": "Your 2-3 sentence summary here",
+    {_VERDICT_FIELDS}
+}}"""
+
+BATCH_CLASSIFY_SYSTEM_PROMPT = f"""You are given a JSON array of news articles. For EACH article, write a 2-3 sentence summary. Then determine if the target state/region is EXPLICITLY mentioned or DIRECTLY relevant to that article's content.
+
+{_RELEVANCE_CRITERIA.format(subject="article")}
+
+Respond with a JSON object with this format, containing one entry per article with the article's "id": {{
+    "articles": [{{
+        "id": "the article id",
+        "summary": "Your 2-3 sentence summary here",
+        {_VERDICT_FIELDS}
+    }}]
+}}"""
+
+RELEVANCE_SYSTEM_PROMPT = f"""You are given a summary of a news article. Determine if the target state/region is EXPLICITLY mentioned or DIRECTLY relevant.
+
+{_RELEVANCE_CRITERIA.format(subject="summary")}
+
+Respond with a JSON object with this format: {{
+    {_VERDICT_FIELDS}
+}}"""
+
+
+def _prompt_version():
+    """Hash everything that shapes a verdict, so cached verdicts are dropped when any of it changes"""
+    parts = [
+        CLASSIFY_SYSTEM_PROMPT,
+        BATCH_CLASSIFY_SYSTEM_PROMPT,
+        RELEVANCE_SYSTEM_PROMPT,
+        str(DESCRIPTION_TOKENS),
+        str(CONTENT_TOKENS)
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+# Stable identifier of the relevance prompts, used in verdict cache keys
+PROMPT_VERSION = _prompt_version()
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Return the tiktoken encoding for the model, or None if tiktoken is unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # Not installed, or its vocabulary cannot be downloaded
+            logger.warning("tiktoken unavailable, estimating tokens from length: %s", e)
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text):
+    """
+    Count the tokens in a text, exactly with tiktoken or estimated at four characters per token
+
+    Args:
+        text (str): The text to measure
+
+    Returns:
+        int: Number of tokens
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _cut_to_tokens(text, budget):
+    """Cut a single over-long sentence to ``budget`` tokens at a word boundary"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text)[:budget])
+    else:
+        cut = text[:budget * 4]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def trim_to_tokens(text, budget):
+    """
+    Shorten text to at most ``budget`` tokens, keeping whole leading sentences
+
+    Args:
+        text (str): Text to shorten
+        budget (int): Maximum number of tokens
+
+    Returns:
+        str: The text itself if it fits, otherwise as many leading sentences as fit (or the
+            first sentence cut at a word boundary if not even that fits)
+    """
+    text = clean_text(text)
+    if budget <= 0 or not text:
+        return ""
+    if count_tokens(text) <= budget:
+        return text
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = count_tokens(sentence) + (1 if kept else 0)
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+    return _cut_to_tokens(text, budget)
+
+
+def article_fields(article):
+    """
+    Return the article fields sent to the model, trimmed to their token budgets
+
+    Args:
+        article (dict): Article containing title, description, and content
+
+    Returns:
+        dict: ``title`` and, when present, ``description`` and ``content``
+    """
+    fields = {"title": " ".join((article.get("title") or "").split())}
+    description = trim_to_tokens(article.get("description"), DESCRIPTION_TOKENS)
+    if description:
+        fields["description"] = description
+    content = trim_to_tokens(article.get("content"), CONTENT_TOKENS)
+    # Content often just repeats the description
+    if content and content != description:
+        fields["content"] = content
+    return fields
+
+
+def _article_text(article):
+    fields = article_fields(article)
+    lines = [f"Title: {fields['title']}"]
+    if "description" in fields:
+        lines.append(f"Description: {fields['description']}")
+    if "content" in fields:
+        lines.append(f"Content: {fields['content']}")
+    return "\n".join(lines)
+
+
+def summary_messages(article):
+    """Build the chat messages for a plain summary of an article"""
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": _article_text(article)}
+    ]
+
+
+def classify_messages(article, target_region):
+    """Build the chat messages for summarizing an article and judging its relevance to a region"""
+    return [
+        {"role": "system", "content": CLASSIFY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Target state/region: {target_region}\n\nArticle:\n{_article_text(article)}"}
+    ]
+
+
+def batch_item(article_id, article):
+    """Return one entry of a batched classification request"""
+    return dict({"id": article_id}, **article_fields(article))
+
+
+def batch_classify_messages(items, target_region):
+    """Build the chat messages for a batched classification request from ``batch_item`` entries"""
+    return [
+        {"role": "system", "content": BATCH_CLASSIFY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Target state/region: {target_region}\n\nArticles:\n{json.dumps(items)}"}
+    ]
+
+
+def relevance_messages(summary, target_region):
+    """Build the chat messages for judging an existing summary's relevance to a region"""
+    return [
+        {"role": "system", "content": RELEVANCE_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Target state/region: {target_region}\n\nSummary: {summary}"}
+    ]
@@ -0,0 +1,168 @@
+import os
+import re
+import csv
+import hashlib
+
+RELEVANT = "relevant"
+IRRELEVANT = "irrelevant"
+UNCERTAIN = "uncertain"
+
+# Confidence added when a strong term (region name, distinctive alias) or a city appears in a field
+_FIELD_WEIGHTS = (("title", 0.6), ("description", 0.3), ("content", 0.2))
+# Confidence added once when only weak terms (postal codes, ambiguous abbreviations) appear
+_WEAK_WEIGHT = 0.1
+# Most confidence from cities alone: "Mobile", "Buffalo" or "Lincoln" are also ordinary words
+# and names, so without the region name the article always goes to the LLM
+_CITY_ONLY_MAX = 0.5
+
+
+def _normalize(name):
+    return " ".join(name.split()).casefold()
+
+
+def _alternation(terms, flags=0):
+    """Compile terms into one regex that only matches whole words; longest terms are tried first"""
+    if not terms:
+        return None
+    ordered = sorted(terms, key=len, reverse=True)
+    return re.compile(r"(?<!\w)(?:" + "|".join(re.escape(term) for term in ordered) + r")(?!\w)", flags)
+
+
+class RelevancePrefilter:
+    """
+    Cheap local check of whether an article is about a region, run before any LLM call
+
+    Each region gets three compiled automata: strong terms (the region name and
+    distinctive aliases, matched case-insensitively), cities (the gazetteer cities only
+    this region has, matched case-sensitively) and weak terms (postal codes,
+    abbreviations that are also ordinary words and city names several regions share,
+    matched case-sensitively). Matches add up to a confidence between 0 and 1, and
+    cities without a strong term add at most ``_CITY_ONLY_MAX``, so a city name alone
+    never settles relevance. A region name that is also another region's city
+    (Washington) only counts as a city. Articles at or above ``high`` are relevant, at
+    or below ``low`` are irrelevant, and only the band in between needs the LLM.
+    """
+
+    def __init__(self, gazetteer_path=None, aliases_path=None, low=None, high=None):
+        """
+        Args:
+            gazetteer_path (str): CSV of ``name,latitude,longitude,admin1,country_code``
+            aliases_path (str): CSV of ``region,alias,strength`` with strength ``strong`` or ``weak``
+            low (float): Confidence at or below which an article is irrelevant
+            high (float): Confidence at or above which an article is relevant
+        """
+        self.gazetteer_path = gazetteer_path or os.getenv("GAZETTEER_PATH", "app/data/gazetteer.csv")
+        self.aliases_path = aliases_path or os.getenv("REGION_ALIASES_PATH", "app/data/region_aliases.csv")
+        self.low = low if low is not None else float(os.getenv("PREFILTER_LOW", "0.0"))
+        self.high = high if high is not None else float(os.getenv("PREFILTER_HIGH", "0.9"))
+
+        digest = hashlib.sha256(f"{self.low}|{self.high}|{_CITY_ONLY_MAX}".encode("utf-8"))
+        for path in (self.gazetteer_path, self.aliases_path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        # Identifies the thresholds and data behind this pre-filter's verdicts
+        self.version = digest.hexdigest()[:12]
+
+        # normalized region -> (strong terms, cities, weak terms)
+        self._terms = {}
+        # normalized city name -> normalized regions that have a city of that name
+        self._city_regions = {}
+        regions_by_city = {}
+        with open(self.gazetteer_path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["admin1"]:
+                    regions_by_city.setdefault(row["name"], set()).add(_normalize(row["admin1"]))
+        for city, regions in regions_by_city.items():
+            self._city_regions.setdefault(_normalize(city), set()).update(regions)
+            for region in regions:
+                _, cities, weak = self._region_terms(region)
+                # A city name shared by several regions is only weak evidence for each of them
+                (cities if len(regions) == 1 else weak).add(city)
+
+        with open(self.aliases_path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                strong, _, weak = self._region_terms(_normalize(row["region"]))
+                (strong if row["strength"] == "strong" else weak).add(row["alias"])
+
+        # normalized region -> (strong automaton, city automaton, weak automaton)
+        self._automata = {}
+
+    def _region_terms(self, key):
+        return self._terms.setdefault(key, (set(), set(), set()))
+
+    def _automata_for(self, region):
+        key = _normalize(region)
+        automata = self._automata.get(key)
+        if automata is None:
+            strong, cities, weak = self._terms.get(key, (set(), set(), set()))
+            strong = set(strong)
+            cities = set(cities)
+            if self._city_regions.get(key, {key}) - {key}:
+                # "Washington" is also the capital's name, so it is no better than a city
+                cities.add(region.strip())
+            else:
+                strong.add(region.strip())
+            automata = (
+                _alternation(strong, re.IGNORECASE),
+                _alternation(cities),
+                _alternation(weak)
+            )
+            self._automata[key] = automata
+        return automata
+
+    def score(self, article, region):
+        """
+        Score how clearly an article is about a region
+
+        Args:
+            article (dict): Processed article with title, description and content
+            region (str): The state/region the article should be about
+
+        Returns:
+            tuple: ``(confidence, matched_terms)``
+        """
+        strong, cities, weak = self._automata_for(region)
+        strong_confidence = 0.0
+        city_confidence = 0.0
+        matched = []
+        for field, weight in _FIELD_WEIGHTS:
+            text = article.get(field) or ""
+            found = strong.findall(text) if strong else []
+            if found:
+                strong_confidence += weight
+            else:
+                found = cities.findall(text) if cities else []
+                if found:
+                    city_confidence += weight
+            matched.extend(term for term in found if term not in matched)
+        if strong_confidence:
+            confidence = strong_confidence + city_confidence
+        else:
+            confidence = min(city_confidence, _CITY_ONLY_MAX)
+        if weak is not None:
+            for field, _ in _FIELD_WEIGHTS:
+                found = weak.findall(article.get(field) or "")
+                if found:
+                    confidence += _WEAK_WEIGHT
+                    matched.extend(term for term in found if term not in matched)
+                    break
+        return min(1.0, round(confidence, 3)), matched
+
+    def classify(self, article, region):
+        """
+        Decide whether an article can skip the LLM relevance check
+
+        Args:
+            article (dict): Processed article with title, description and content
+            region (str): The state/region the article should be about
+
+        Returns:
+            tuple: ``(verdict, confidence, matched_terms)`` where verdict is
+                ``RELEVANT``, ``IRRELEVANT`` or ``UNCERTAIN``
+        """
+        confidence, matched = self.score(article, region)
+        if confidence >= self.high:
+            return RELEVANT, confidence, matched
+        if confidence <= self.low:
+            return IRRELEVANT, confidence, matched
+        return UNCERTAIN, confidence, matched
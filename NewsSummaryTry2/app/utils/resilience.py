@@ -0,0 +1,306 @@
+import time
+import logging
+import random
+import asyncio
+import email.utils
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit is open or whose rate limit is exhausted"""
+
+
+def parse_retry_after(value):
+    """
+    Parse a ``Retry-After`` header
+
+    Args:
+        value (str): Delay in seconds or an HTTP date, or None
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base_delay, max_delay, retry_after=None):
+    """
+    Return how long to wait before retry number ``attempt + 1``
+
+    Exponential backoff with full jitter, so clients that failed together do not retry
+    together. A ``Retry-After`` from the upstream is a lower bound.
+
+    Args:
+        attempt (int): Number of the attempt that just failed, starting at 0
+        base_delay (float): Delay ceiling of the first retry in seconds
+        max_delay (float): Largest delay ceiling in seconds
+        retry_after (float): Delay requested by the upstream, or None
+
+    Returns:
+        float: Seconds to wait
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base_delay)
+    return delay
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter
+
+    Tokens refill at ``rate`` per second up to ``burst``. Each call takes one token,
+    waiting for it if the bucket is empty. Waiters reserve their token up front, so
+    they are served in arrival order.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+            rate (float): Sustained calls per second; 0 or None disables limiting
+            burst (int): Calls allowed back to back after an idle period
+        """
+        self.rate = rate or 0
+        self.burst = max(1, burst or int(self.rate) or 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, max_wait=None):
+        """
+        Take one token, waiting until it is available
+
+        Args:
+            max_wait (float): Give up instead of waiting longer than this many seconds
+
+        Returns:
+            bool: True once a token was taken, False if it would take longer than ``max_wait``
+        """
+        if not self.rate:
+            return True
+        self._refill()
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if max_wait is not None and wait > max_wait:
+            return False
+        self._tokens -= 1
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops calls to a failing upstream and recovers by itself
+
+    After ``failure_threshold`` consecutive failures the circuit opens and every call
+    is refused for ``reset_timeout`` seconds. It then turns half-open: a single probe
+    call is let through, and its outcome either closes the circuit again or reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe is allowed
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._open_until = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._open_until is None:
+            return self.CLOSED
+        if time.monotonic() < self._open_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_in(self):
+        """Return the seconds left until the circuit lets a probe through"""
+        if self._open_until is None:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow(self):
+        """
+        Decide whether a call may go ahead; a half-open circuit admits one probe at a time
+
+        Returns:
+            bool: True if the call may be made
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release(self):
+        """Give up a probe slot without an outcome, for example when the call was cancelled"""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self._open_until = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, duration=None):
+        """Open the circuit for ``duration`` seconds (``reset_timeout`` by default)"""
+        if self.state != self.OPEN:
+            self.opened += 1
+        self._open_until = time.monotonic() + (duration if duration is not None else self.reset_timeout)
+        self._probing = False
+
+
+class UpstreamPolicy:
+    """
+    Rate limiting, retries and circuit breaking for every call to one upstream
+
+    A call first needs the circuit to be closed (or to be the half-open probe) and a
+    token from the rate limiter. Transient failures (connection errors, timeouts,
+    HTTP 429 and 5xx) are retried with jittered exponential backoff that honors
+    ``Retry-After``, and count towards opening the circuit. Other errors and
+    responses are returned to the caller as they are.
+    """
+
+    def __init__(self, name, rate_limiter=None, breaker=None, max_retries=2, base_delay=0.2,
+                 max_delay=2.0, max_wait=5.0):
+        """
+        Args:
+            name (str): Upstream name used in errors and logs
+            rate_limiter (TokenBucket): Limiter shared by every call, or None for no limit
+            breaker (CircuitBreaker): Breaker shared by every call
+            max_retries (int): Retries after the first attempt of a transiently failing call
+            base_delay (float): Backoff ceiling of the first retry in seconds
+            max_delay (float): Largest backoff in seconds; a longer ``Retry-After`` opens the
+                circuit for that long instead of holding the request
+            max_wait (float): Longest a call waits for a rate limiter token
+        """
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.retries = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _transient_failure(outcome):
+        """
+        Classify a response or exception
+
+        Returns:
+            tuple: ``(transient, retry_after)``
+        """
+        response = outcome if isinstance(outcome, httpx.Response) else getattr(outcome, "response", None)
+        if isinstance(response, httpx.Response):
+            if response.status_code == 429 or response.status_code >= 500:
+                return True, parse_retry_after(response.headers.get("Retry-After"))
+            return False, None
+        transient = isinstance(outcome, (httpx.TransportError, openai.APIConnectionError, asyncio.TimeoutError))
+        return transient, None
+
+    async def call(self, func):
+        """
+        Run ``func()`` under the policy
+
+        Args:
+            func (callable): Zero-argument function returning a coroutine, called once per attempt
+
+        Returns:
+            The result of the last attempt; an ``httpx.Response`` with a failing status is
+            returned once retries are used up
+
+        Raises:
+            UpstreamUnavailable: If the circuit is open or no rate limiter token is available in time
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise UpstreamUnavailable(
+                    f"{self.name} circuit is open, retrying in {self.breaker.retry_in():.1f}s"
+                )
+            try:
+                if self.rate_limiter is not None and not await self.rate_limiter.acquire(self.max_wait):
+                    self.breaker.release()
+                    self.rejected += 1
+                    raise UpstreamUnavailable(f"{self.name} rate limit exceeded")
+                outcome = await func()
+            except (asyncio.CancelledError, UpstreamUnavailable):
+                self.breaker.release()
+                raise
+            except Exception as e:
+                outcome = e
+
+            transient, retry_after = self._transient_failure(outcome)
+            if not transient:
+                # The upstream answered, even if it rejected the request
+                self.breaker.record_success()
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+            self.breaker.record_failure()
+            if retry_after is not None and retry_after > self.max_delay:
+                # Refuse calls until the upstream is ready again instead of holding requests
+                logger.warning("%s asked to retry after %.1fs, opening its circuit", self.name, retry_after)
+                self.breaker.trip(retry_after)
+            if attempt >= self.max_retries or self.breaker.state != CircuitBreaker.CLOSED:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+            attempt += 1
+            self.retries += 1
+            logger.info("%s call failed transiently, retry %s of %s in %.2fs", self.name, attempt, self.max_retries, delay)
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        """
+        Return the breaker state and counters
+
+        Returns:
+            dict: ``state``, ``consecutive_failures``, ``times_opened``, ``retries`` and ``rejected``
+        """
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "times_opened": self.breaker.opened,
+            "retries": self.retries,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,68 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one shared run
+
+    The first caller for a key starts the work as a task; everyone who asks for
+    the same key while it is running awaits that task instead of starting their
+    own. Results and exceptions are delivered to every waiter. Waiters are
+    shielded from the task, so a waiter that is cancelled (for example because
+    its client disconnected) does not cancel the shared run.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key, func):
+        """
+        Run ``func()`` for ``key`` unless a run for that key is already in flight
+
+        Args:
+            key: Hashable key identifying identical work
+            func (callable): Zero-argument function returning a coroutine
+
+        Returns:
+            The result of the shared run
+        """
+        return await asyncio.shield(self.start(key, func))
+
+    def start(self, key, func):
+        """
+        Start ``func()`` for ``key`` unless a run for that key is already in flight, without waiting
+
+        Args:
+            key: Hashable key identifying identical work
+            func (callable): Zero-argument function returning a coroutine
+
+        Returns:
+            asyncio.Task: The shared run; cancelling it cancels the run for every waiter
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def in_flight(self, key):
+        """Return True if a run for ``key`` is currently in flight"""
+        return key in self._inflight
+
+    async def cancel_all(self):
+        """Cancel every run still in flight, for example on shutdown"""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import re
+import threading
+
+import anyio
+from starlette.staticfiles import StaticFiles
+
+# "css/styles.0123456789.css" -> ("css/styles", "0123456789", ".css")
+_FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{10})(?P<ext>\.[^./\\]+)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    Static files served under content-hashed names with long-lived cache headers
+
+    ``fingerprint("css/styles.css")`` returns e.g. ``css/styles.0123456789.css``,
+    where the digits are taken from a hash of the file's content. Requests for the
+    current fingerprinted name get the file with a one-year ``immutable``
+    ``Cache-Control``, so browsers never ask for it again; a changed file gets a new
+    name. Plain names (and outdated fingerprints) are still served, but must be
+    revalidated with the ETag on every use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        # full path -> (mtime_ns, size, digest)
+        self._digests = {}
+
+    def fingerprint(self, path):
+        """
+        Return the content-hashed name of a static file
+
+        Args:
+            path (str): Path relative to the static directory, e.g. ``css/styles.css``
+
+        Returns:
+            str: The fingerprinted path, or ``path`` unchanged if the file does not exist
+        """
+        path = path.lstrip("/")
+        digest = self._digest(os.path.normpath(path))
+        if digest is None:
+            return path
+        stem, ext = os.path.splitext(path)
+        return f"{stem}.{digest}{ext}"
+
+    def _digest(self, path):
+        """Return the content digest of a static file, rehashing only when it changed on disk"""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not os.path.isfile(full_path):
+            return None
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+        with self._lock:
+            cached = self._digests.get(full_path)
+        if cached is not None and cached[:2] == version:
+            return cached[2]
+        with open(full_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:10]
+        with self._lock:
+            self._digests[full_path] = version + (digest,)
+        return digest
+
+    async def get_response(self, path, scope):
+        match = _FINGERPRINT_RE.match(os.path.basename(path))
+        if match:
+            original = os.path.join(os.path.dirname(path), match["stem"] + match["ext"])
+            digest = await anyio.to_thread.run_sync(self._digest, original)
+            if digest is not None:
+                response = await super().get_response(original, scope)
+                response.headers["Cache-Control"] = (
+                    IMMUTABLE_CACHE_CONTROL if digest == match["digest"] else REVALIDATE_CACHE_CONTROL
+                )
+                return response
+        response = await super().get_response(path, scope)
+        response.headers.setdefault("Cache-Control", REVALIDATE_CACHE_CONTROL)
+        return response
@@ -0,0 +1,35 @@
+import re
+
+# NewsAPI cuts content short and appends e.g. "… [+2345 chars]"
+TRUNCATION_RE = re.compile(r"\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+# NewsAPI titles usually end with " - Outlet Name"
+SOURCE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,60}$")
+# A sentence ends at ., ! or ? (optionally followed by a closing quote or bracket) before
+# whitespace and a capital, digit or opening quote, so "U.S. officials" is not split after "U.S."
+SENTENCE_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def clean_text(text):
+    """Drop NewsAPI's "[+N chars]" truncation marker and collapse whitespace"""
+    return " ".join(TRUNCATION_RE.sub("", text or "").split())
+
+
+def is_truncated(text):
+    """Return True if NewsAPI cut the text short"""
+    return bool(TRUNCATION_RE.search(text or ""))
+
+
+def strip_source_suffix(title):
+    """Return a title without its " - Outlet Name" suffix, whitespace collapsed"""
+    return SOURCE_SUFFIX_RE.sub("", " ".join((title or "").split()))
+
+
+def split_sentences(text):
+    """Split text into its non-empty sentences"""
+    return [part.strip() for part in SENTENCE_RE.split(text) if part.strip()]
+
+
+def words(text):
+    """Return the lowercase words of a text, keeping contractions such as ``don't`` whole"""
+    return _WORD_RE.findall((text or "").lower())
@@ -0,0 +1,111 @@
+import os
+import time
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+
+from app.utils.metrics import HTTP_SECONDS
+
+# Trace ID of the request being handled, or "-" outside of a request
+trace_id = ContextVar("trace_id", default="-")
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s"
+
+_listener = None
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+
+class TraceIdFilter(logging.Filter):
+    """Add the current trace ID to every log record"""
+
+    def filter(self, record):
+        record.trace_id = trace_id.get()
+        return True
+
+
+def configure_logging():
+    """
+    Send log records through a queue to a background thread
+
+    Handlers that write to a terminal or file can block, so the app only puts
+    records on an in-memory queue and a ``QueueListener`` thread writes them out.
+    The level comes from ``LOG_LEVEL`` (``INFO`` by default). Calling this again
+    does nothing.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    # The trace ID has to be read in the task that logged, not in the listener thread
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(TraceIdFilter())
+
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out the queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class TraceMiddleware:
+    """
+    ASGI middleware that gives every request a trace ID and times it
+
+    The ID is taken from an ``X-Request-ID`` header if the client sent one, set as the
+    context for every log record written while handling the request and echoed in the
+    response. The time until the response headers are sent is recorded per route in
+    ``http_request_duration_seconds``; for streamed responses this is the time to the
+    first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"x-request-id"), None
+        )
+        request_id = (request_id or new_trace_id())[:64]
+        token = trace_id.set(request_id)
+        started = time.perf_counter()
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+                # The route is only known once routing has happened; unmatched paths share one label
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_SECONDS.observe(
+                    time.perf_counter() - started,
+                    method=scope["method"], route=route, status=message["status"]
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            trace_id.reset(token)
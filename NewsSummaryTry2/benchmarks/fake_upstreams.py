@@ -0,0 +1,197 @@
+import os
+import re
+import json
+import math
+import time
+import random
+import asyncio
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+UPSTREAMS = ("newsapi", "geocoding", "openai")
+
+_TARGET_RE = re.compile(r"Target state/region: (.+)")
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FaultProfile:
+    """Latency, jitter and error rate applied to every request to one fake upstream"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        """
+        Args:
+            latency (float): Mean response time in seconds
+            jitter (float): Response times vary uniformly by this fraction of ``latency``
+            error_rate (float): Share of requests answered with HTTP 503
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+
+class FakeUpstreams:
+    """
+    Local stand-ins for NewsAPI, Google Geocoding and OpenAI chat completions
+
+    Responses are replayed from the recorded fixtures in ``benchmarks/fixtures``:
+    NewsAPI pages are cut from one recorded result set (articles matching the
+    query first), geocoding returns the nearest recorded place, and chat
+    completions are assembled from recorded summaries with a verdict based on
+    whether the article names the target region. Every call is counted so a
+    benchmark can report upstream calls per request.
+    """
+
+    def __init__(self, profiles=None, seed=1):
+        """
+        Args:
+            profiles (dict): ``FaultProfile`` per upstream name; missing upstreams answer at once
+            seed (int): Seed for latency jitter and injected errors, so runs are repeatable
+        """
+        self.profiles = profiles or {}
+        self.random = random.Random(seed)
+        self.articles = _load_fixture("newsapi_articles.json")["articles"]
+        self.places = _load_fixture("geocode.json")["places"]
+        self.chat = _load_fixture("chat_completions.json")
+        self.reset()
+        self.app = self._create_app()
+
+    def reset(self):
+        """Clear the call counters"""
+        self.calls = Counter()
+        self.errors = Counter()
+        self.prompt_chars = 0
+
+    def stats(self):
+        """
+        Return the call counters
+
+        Returns:
+            dict: ``calls`` and ``errors`` per upstream, and ``openai_prompt_tokens`` (estimated)
+        """
+        return {
+            "calls": {name: self.calls[name] for name in UPSTREAMS},
+            "errors": {name: self.errors[name] for name in UPSTREAMS},
+            "openai_prompt_tokens": self.prompt_chars // 4
+        }
+
+    async def _simulate(self, upstream):
+        """Count a call, wait like the real upstream would and decide whether it fails"""
+        self.calls[upstream] += 1
+        profile = self.profiles.get(upstream)
+        if profile is None:
+            return None
+        delay = profile.latency * self.random.uniform(1 - profile.jitter, 1 + profile.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.random.random() < profile.error_rate:
+            self.errors[upstream] += 1
+            return JSONResponse(status_code=503, content={"status": "error", "message": "Injected failure"})
+        return None
+
+    def _news_page(self, params, headlines):
+        query = (params.get("q") or "").casefold()
+        page_size = int(params.get("pageSize", 20))
+        page = int(params.get("page", 1))
+        matching = [a for a in self.articles if query and query in f"{a['title']} {a['description']} {a['content']}".casefold()]
+        if headlines:
+            results = matching
+        else:
+            # Full-text search also surfaces articles that only match loosely
+            results = matching + [a for a in self.articles if a not in matching]
+        start = (page - 1) * page_size
+        return {"status": "ok", "totalResults": len(results), "articles": results[start:start + page_size]}
+
+    def _nearest_place(self, latitude, longitude):
+        def distance(place):
+            # Equirectangular approximation; the fixture places are far apart
+            x = math.radians(place["longitude"] - longitude) * math.cos(math.radians(latitude))
+            y = math.radians(place["latitude"] - latitude)
+            return x * x + y * y
+        return min(self.places, key=distance)
+
+    def _verdict(self, text, region):
+        relevant = bool(region) and region.casefold() in text.casefold()
+        template = self.chat["relevant_justification" if relevant else "irrelevant_justification"]
+        return {
+            "mentions_region": relevant,
+            "relevance_score": 8 if relevant else 2,
+            "justification": template.format(region=region)
+        }
+
+    def _summary(self, text):
+        summaries = self.chat["summaries"]
+        return summaries[sum(map(ord, text)) % len(summaries)]
+
+    def _completion_content(self, body):
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = "\n".join(m["content"] for m in messages if m["role"] == "user")
+        target = _TARGET_RE.search(user)
+        region = target.group(1).strip() if target else ""
+
+        if not body.get("response_format"):
+            return self._summary(user)
+        if '"articles"' in system:
+            items = json.loads(user.split("Articles:\n", 1)[1])
+            return json.dumps({"articles": [
+                dict(self._verdict(json.dumps(item), region), id=item["id"], summary=self._summary(json.dumps(item)))
+                for item in items
+            ]})
+        if "Summary:" in user:
+            return json.dumps(self._verdict(user.split("Summary:", 1)[1], region))
+        article = user.split("Article:\n", 1)[-1]
+        return json.dumps(dict(self._verdict(article, region), summary=self._summary(article)))
+
+    def _create_app(self):
+        app = FastAPI(title="Fake upstreams")
+
+        @app.get("/newsapi/v2/{endpoint}")
+        async def newsapi(endpoint: str, request: Request):
+            failure = await self._simulate("newsapi")
+            if failure is not None:
+                return failure
+            return self._news_page(request.query_params, endpoint == "top-headlines")
+
+        @app.get("/geocode/json")
+        async def geocode(latlng: str):
+            failure = await self._simulate("geocoding")
+            if failure is not None:
+                return failure
+            latitude, longitude = (float(part) for part in latlng.split(","))
+            return {"status": "OK", "results": self._nearest_place(latitude, longitude)["results"]}
+
+        @app.post("/openai/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self.prompt_chars += sum(len(m.get("content") or "") for m in body.get("messages", []))
+            failure = await self._simulate("openai")
+            if failure is not None:
+                return JSONResponse(status_code=503, content={"error": {"message": "Injected failure", "type": "server_error"}})
+            content = self._completion_content(body)
+            return {
+                "id": f"chatcmpl-bench-{self.calls['openai']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": self.chat["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            }
+
+        @app.get("/_stats")
+        async def stats():
+            return self.stats()
+
+        @app.post("/_reset")
+        async def reset():
+            self.reset()
+            return self.stats()
+
+        return app
@@ -0,0 +1,350 @@
+"""
+Offline load test of the /api/location -> /api/news pipeline
+
+Starts the fake upstreams and the app (pointed at them through its base URL
+settings), drives simulated users at fixed concurrency levels and reports
+throughput, latency percentiles, time to first article and upstream calls per
+request. Results are written as JSON so runs can be compared.
+
+Run from the project root:
+
+    python -m benchmarks.run_benchmark --levels 1,4,16 --requests 48
+    python -m benchmarks.run_benchmark --stream --compare benchmarks/results/previous.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import asyncio
+import argparse
+import datetime
+import tempfile
+import subprocess
+
+import httpx
+import uvicorn
+
+from benchmarks.fake_upstreams import FakeUpstreams, FaultProfile, UPSTREAMS
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a list of numbers, or None if it is empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize_latencies(values):
+    """Return p50/p95/p99 and mean of a list of latencies in seconds, rounded to milliseconds"""
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
+    return {
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "mean_ms": ms(sum(values) / len(values)) if values else None
+    }
+
+
+def _parse_per_upstream(value, default):
+    """Parse ``"openai=0.6,newsapi=0.25"`` (or a bare number for all upstreams) into a dict"""
+    result = {name: default for name in UPSTREAMS}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, _, number = part.partition("=")
+            if name.strip() not in result:
+                raise ValueError(f"Unknown upstream: {name}")
+            result[name.strip()] = float(number)
+        else:
+            result = {name: float(part) for name in UPSTREAMS}
+    return result
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppProcess:
+    """The app under test, run by uvicorn in a subprocess with its upstreams pointed at the fakes"""
+
+    def __init__(self, fake_url, workdir, extra_env=None, feed_cache=True):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(
+            os.environ,
+            NEWSAPI_BASE_URL=f"{fake_url}/newsapi/v2",
+            GEOCODING_BASE_URL=f"{fake_url}/geocode/json",
+            OPENAI_BASE_URL=f"{fake_url}/openai/v1",
+            NEWSAPI_KEY="bench",
+            GOOGLE_API_KEY="bench",
+            OPENAI_API_KEY="sk-bench",
+            SUMMARY_STORE_PATH=os.path.join(workdir, "summaries.db"),
+            GEOCODE_STORE_PATH=os.path.join(workdir, "geocode.db"),
+            ARTICLE_STORE_PATH=os.path.join(workdir, "articles.db"),
+            GAZETTEER_INDEX_PATH=os.path.join(workdir, "gazetteer.kdtree"),
+            PREWARM_ENABLED="0"
+        )
+        if not feed_cache:
+            # Every request past the first one for a region rebuilds the feed in the foreground
+            self.env["FEED_MAX_STALE"] = "0"
+        self.env.update(extra_env or {})
+        self.log_path = os.path.join(workdir, "app.log")
+        self.process = None
+
+    async def start(self, timeout=60):
+        log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"],
+            cwd=PROJECT_DIR, env=self.env, stdout=log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"App exited with code {self.process.returncode}, see {self.log_path}")
+                try:
+                    if (await client.get(self.url)).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"App did not start within {timeout}s, see {self.log_path}")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+async def _session(client, app_url, place, stream):
+    """One simulated user: resolve the location, then load the news feed"""
+    result = {"ok": False}
+    started = time.monotonic()
+    response = await client.post(
+        f"{app_url}/api/location", json={"latitude": place["latitude"], "longitude": place["longitude"]}
+    )
+    result["location_s"] = time.monotonic() - started
+    if response.status_code != 200:
+        result["error"] = f"location {response.status_code}"
+        return result
+    location = response.json()
+
+    started = time.monotonic()
+    if stream:
+        articles = 0
+        async with client.stream("POST", f"{app_url}/api/news/stream", json={"location": location}) as response:
+            if response.status_code != 200:
+                result["error"] = f"news {response.status_code}"
+                return result
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                frame = json.loads(line)
+                if frame["type"] == "article":
+                    if articles == 0:
+                        result["first_article_s"] = time.monotonic() - started
+                    articles += 1
+                elif frame["type"] == "error":
+                    result["error"] = frame["error"]
+    else:
+        response = await client.post(f"{app_url}/api/news", json={"location": location})
+        if response.status_code != 200:
+            result["error"] = f"news {response.status_code}"
+        else:
+            articles = len(response.json().get("articles", []))
+            # The whole feed arrives at once
+            if articles:
+                result["first_article_s"] = time.monotonic() - started
+    result["news_s"] = time.monotonic() - started
+    result["articles"] = articles if "error" not in result else 0
+    result["ok"] = "error" not in result
+    return result
+
+
+async def run_level(app_url, fake, places, concurrency, requests, stream):
+    """
+    Run ``requests`` sessions with ``concurrency`` simulated users at a time
+
+    Returns:
+        dict: Throughput, latency percentiles, time to first article and upstream calls per request
+    """
+    fake.reset()
+    queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(places[index % len(places)])
+    results = []
+
+    async def user(client):
+        while not queue.empty():
+            place = queue.get_nowait()
+            try:
+                results.append(await _session(client, app_url, place, stream))
+            except Exception as e:
+                results.append({"ok": False, "error": str(e)})
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.monotonic()
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    ok = [r for r in results if r["ok"]]
+    upstream = fake.stats()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(results) - len(ok),
+        "error_samples": sorted({r["error"] for r in results if not r["ok"]})[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "location_latency": summarize_latencies([r["location_s"] for r in ok]),
+        "news_latency": summarize_latencies([r["news_s"] for r in ok]),
+        "time_to_first_article": summarize_latencies([r["first_article_s"] for r in ok if "first_article_s" in r]),
+        "articles_per_feed": round(sum(r["articles"] for r in ok) / len(ok), 2) if ok else 0,
+        "upstream_calls_per_request": {
+            name: round(count / requests, 3) for name, count in upstream["calls"].items()
+        },
+        "upstream_errors": upstream["errors"],
+        "openai_prompt_tokens_per_request": round(upstream["openai_prompt_tokens"] / requests, 1)
+    }
+
+
+def compare(current, previous, threshold):
+    """
+    Print throughput and p95 changes against an earlier run
+
+    Returns:
+        list: Descriptions of regressions worse than ``threshold`` (a fraction)
+    """
+    regressions = []
+    earlier = {level["concurrency"]: level for level in previous["levels"]}
+    print(f"\nCompared with {previous['started_at']}:")
+    for level in current["levels"]:
+        old = earlier.get(level["concurrency"])
+        if old is None:
+            continue
+        checks = (
+            ("throughput_rps", level["throughput_rps"], old["throughput_rps"], True),
+            ("news p95", level["news_latency"]["p95_ms"], old["news_latency"]["p95_ms"], False),
+            ("first article p95", level["time_to_first_article"]["p95_ms"], old["time_to_first_article"]["p95_ms"], False)
+        )
+        for name, new_value, old_value, higher_is_better in checks:
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            print(f"  c={level['concurrency']:<3} {name:<18} {old_value:>10} -> {new_value:<10} ({change:+.1%})")
+            if (change < -threshold) if higher_is_better else (change > threshold):
+                regressions.append(f"c={level['concurrency']} {name} {change:+.1%}")
+    return regressions
+
+
+def print_level(level):
+    news = level["news_latency"]
+    first = level["time_to_first_article"]
+    calls = level["upstream_calls_per_request"]
+    print(
+        f"c={level['concurrency']:<3} {level['throughput_rps']:>7} req/s  "
+        f"news p50/p95/p99 {news['p50_ms']}/{news['p95_ms']}/{news['p99_ms']} ms  "
+        f"first article p95 {first['p95_ms']} ms  errors {level['errors']}  "
+        f"calls/req news {calls['newsapi']} openai {calls['openai']} geo {calls['geocoding']}"
+    )
+
+
+async def main(args):
+    profiles = {
+        name: FaultProfile(latency, args.jitter, args.error_rate[name])
+        for name, latency in args.latency.items()
+    }
+    fake = FakeUpstreams(profiles, seed=args.seed)
+    fake_port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=fake_port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    with tempfile.TemporaryDirectory() as workdir:
+        app = AppProcess(f"http://127.0.0.1:{fake_port}", workdir, extra_env, feed_cache=not args.no_feed_cache)
+        try:
+            await app.start()
+            levels = []
+            for concurrency in args.levels:
+                level = await run_level(app.url, fake, fake.places, concurrency, args.requests, args.stream)
+                print_level(level)
+                levels.append(level)
+        finally:
+            app.stop()
+            server.should_exit = True
+            await server_task
+
+    return {
+        "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "levels": args.levels,
+            "requests": args.requests,
+            "stream": args.stream,
+            "feed_cache": not args.no_feed_cache,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "env": extra_env
+        },
+        "levels": levels
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the news pipeline against fake upstreams")
+    parser.add_argument("--levels", default="1,4,16", type=lambda v: [int(x) for x in v.split(",")],
+                        help="Concurrency levels to run, comma separated")
+    parser.add_argument("--requests", type=int, default=32, help="Sessions per concurrency level")
+    parser.add_argument("--latency", default="newsapi=0.25,geocoding=0.05,openai=0.6",
+                        type=lambda v: _parse_per_upstream(v, 0.0), help="Upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the latency")
+    parser.add_argument("--error-rate", default="0", type=lambda v: _parse_per_upstream(v, 0.0),
+                        help="Share of upstream requests answered with 503")
+    parser.add_argument("--stream", action="store_true", help="Load the feed from /api/news/stream")
+    parser.add_argument("--no-feed-cache", action="store_true", help="Rebuild the feed for every request")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment variable for the app, may be repeated")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for latency jitter and injected errors")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change counted as a regression when comparing")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            sys.exit(1)
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_stores(tmp_path, monkeypatch):
+    """Keep every SQLite store and index a test opens in its own temporary directory"""
+    monkeypatch.setenv("SUMMARY_STORE_PATH", str(tmp_path / "summaries.db"))
+    monkeypatch.setenv("GEOCODE_STORE_PATH", str(tmp_path / "geocode.db"))
+    monkeypatch.setenv("ARTICLE_STORE_PATH", str(tmp_path / "articles.db"))
+    monkeypatch.setenv("GAZETTEER_INDEX_PATH", str(tmp_path / "gazetteer.kdtree"))
+    monkeypatch.setenv("NEWSAPI_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return tmp_path
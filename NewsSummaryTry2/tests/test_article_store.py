@@ -0,0 +1,48 @@
+import time
+
+from app.utils.article_store import ArticleStore
+
+ARTICLE = {
+    "title": "Sacramento approves new light rail line",
+    "description": "The city council approved a new light rail line.",
+    "url": "https://news.example/rail",
+    "source": "Example",
+    "ai_summary": "Sacramento approved a light rail line.",
+    "summary_source": "llm"
+}
+ANALYSIS = {"mentions_region": True, "relevance_score": 9, "justification": "Names Sacramento"}
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_buffered_writes_are_committed_after_the_flush_interval_without_another_write(tmp_path):
+    path = str(tmp_path / "articles.db")
+    writer = ArticleStore(path, batch_size=50, flush_interval=0.05)
+    reader = ArticleStore(path)
+    try:
+        writer.record("hash", ARTICLE, "California", ANALYSIS, "v1")
+        assert reader.get_verdict("hash", "California", "v1") is None
+        assert wait_for(lambda: reader.get_verdict("hash", "California", "v1") is not None)
+        verdict = reader.get_verdict("hash", " california ", "v1")
+        assert verdict["relevance_score"] == 9
+        assert verdict["summary"] == ARTICLE["ai_summary"]
+        assert verdict["summary_source"] == "llm"
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_verdicts_of_another_version_are_ignored(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"), batch_size=1)
+    try:
+        store.record("hash", ARTICLE, "California", ANALYSIS, "v1")
+        assert store.get_verdict("hash", "California", "v2") is None
+    finally:
+        store.close()
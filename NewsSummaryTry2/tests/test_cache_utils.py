@@ -0,0 +1,39 @@
+import time
+
+from app.utils.cache_utils import PersistentCache
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_buffered_writes_are_committed_after_the_flush_interval_without_another_write(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = PersistentCache(path, "test", batch_size=50, flush_interval=0.05)
+    reader = PersistentCache(path, "test")
+    try:
+        writer.set("key", {"summary": "A summary."})
+        assert reader.get("key") is None
+        assert wait_for(lambda: reader.get("key") is not None)
+        assert reader.get("key") == {"summary": "A summary."}
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_full_batch_is_committed_at_once(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = PersistentCache(path, "test", batch_size=2, flush_interval=60)
+    reader = PersistentCache(path, "test")
+    try:
+        writer.set("a", 1)
+        writer.set("b", 2)
+        assert (reader.get("a"), reader.get("b")) == (1, 2)
+    finally:
+        writer.close()
+        reader.close()
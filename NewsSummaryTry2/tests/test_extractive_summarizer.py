@@ -0,0 +1,40 @@
+from app.services.openai_service import OpenAIService
+from app.utils.extractive_summarizer import SOURCE_EXTRACTIVE, split_sentences, summarize
+
+ARTICLE = {
+    "title": "Sacramento approves new light rail line - The Sacramento Bee",
+    "description": "The Sacramento city council approved a new light rail line on Tuesday.",
+    "content": "The Sacramento city council approved a new light rail line on Tuesday. "
+               "The line will connect downtown Sacramento with the airport by 2030. "
+               "Construction is expected to cost about $1.2 billion, most of it from state grants. "
+               "Council members said the rail line would ease traffic on Interstate 5 and cut commu… [+2817 chars]"
+}
+
+
+def test_sentences_keep_order_and_drop_the_truncated_tail():
+    sentences = split_sentences(ARTICLE)
+    assert sentences == [
+        "The Sacramento city council approved a new light rail line on Tuesday.",
+        "The line will connect downtown Sacramento with the airport by 2030.",
+        "Construction is expected to cost about $1.2 billion, most of it from state grants."
+    ]
+
+
+def test_summary_keeps_source_order_without_truncation_marker():
+    summary = summarize(ARTICLE, max_sentences=2, max_words=60)
+    sentences = split_sentences(ARTICLE)
+    picked = [sentence for sentence in sentences if sentence in summary]
+    assert len(picked) == 2
+    assert summary == " ".join(picked)
+    assert "[+" not in summary and "chars]" not in summary
+
+
+def test_summary_falls_back_to_title_without_outlet():
+    assert summarize({"title": "Storm hits Fresno - AP News"}) == "Storm hits Fresno"
+
+
+def test_openai_service_extractive_summary_makes_no_call():
+    service = OpenAIService(client=object())
+    result = service.extractive_summary(ARTICLE)
+    assert result["summary_source"] == SOURCE_EXTRACTIVE == "extractive"
+    assert result["summary"] == summarize(ARTICLE)
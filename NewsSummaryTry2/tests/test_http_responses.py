@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.http_responses import MIN_COMPRESS_BYTES, dumps
+
+LOCATION = {"region": "California", "country": "United States", "country_code": "US"}
+
+
+def feed_articles(count):
+    return [
+        {
+            "title": f"Story {i} in California",
+            "summary": f"Summary of story {i}.",
+            "content": "Content " * 20,
+            "url": f"https://news.example/{i}",
+            "source": "Example",
+            "ai_analysis": {"mentions_region": True, "relevance_score": 8, "justification": "Names the region"}
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    """A client for the app whose feed service returns ``app_client.articles`` without any upstream call"""
+    # Imported here so the module-level services open their stores in the test's directory
+    from app.main import app
+    from app.routes import news_routes
+
+    async def get_feed(location):
+        return {"articles": client.articles, "search_queries": {"used_endpoint": "top-headlines"}}
+
+    monkeypatch.setattr(news_routes.feed_service, "get_feed", get_feed)
+    monkeypatch.setattr(news_routes.prewarm_scheduler, "record", lambda location: None)
+    # Not entered as a context manager, so the lifespan (pooled clients, pre-warming) never runs
+    client = TestClient(app)
+    client.articles = feed_articles(2)
+    return client
+
+
+def test_news_response_has_an_etag_and_answers_if_none_match_with_304(app_client):
+    response = app_client.get("/api/news", params=LOCATION)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"].startswith("private, max-age=")
+
+    not_modified = app_client.get("/api/news", params=LOCATION, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    app_client.articles = feed_articles(3)
+    changed = app_client.get("/api/news", params=LOCATION, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_only_large_bodies_are_gzipped_and_only_when_accepted(app_client):
+    small = app_client.get("/api/news", params=LOCATION, headers={"Accept-Encoding": "gzip"})
+    assert len(small.content) < MIN_COMPRESS_BYTES
+    assert "content-encoding" not in small.headers
+
+    app_client.articles = feed_articles(20)
+    large = app_client.get("/api/news", params=LOCATION, headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept-Encoding"
+    assert large.json()["articles"] == app_client.articles
+    assert int(large.headers["content-length"]) < len(dumps(large.json()))
+
+    for accept_encoding in ("identity", "gzip;q=0"):
+        plain = app_client.get("/api/news", params=LOCATION, headers={"Accept-Encoding": accept_encoding})
+        assert "content-encoding" not in plain.headers
+        assert plain.json()["articles"] == app_client.articles
+
+
+def test_fields_projects_every_article(app_client):
+    response = app_client.get("/api/news", params=dict(LOCATION, fields="title, url,missing"))
+    assert response.status_code == 200
+    assert response.json()["articles"] == [
+        {"title": article["title"], "url": article["url"]} for article in app_client.articles
+    ]
+    assert response.json()["location"] == LOCATION
+
+
+def test_only_current_fingerprinted_static_urls_are_immutable(app_client):
+    from app.main import static_files
+
+    fingerprinted = static_files.fingerprint("css/styles.css")
+    assert fingerprinted != "css/styles.css"
+
+    response = app_client.get(f"/static/{fingerprinted}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    for path in ("css/styles.css", "css/styles.0000000000.css"):
+        response = app_client.get(f"/static/{path}")
+        assert response.status_code == 200
+        assert "immutable" not in response.headers["cache-control"]
+        assert response.headers["cache-control"] == "no-cache"
+
+    assert app_client.get("/static/css/missing.0000000000.css").status_code == 404
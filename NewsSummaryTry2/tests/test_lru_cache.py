@@ -0,0 +1,101 @@
+import pytest
+
+from app.utils import lru_cache
+from app.utils.lru_cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(lru_cache, "time", clock)
+    return clock
+
+
+def test_entry_cap_evicts_least_recently_used_first():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_byte_cap_evicts_until_under_the_limit():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("a", "xxxx")
+    cache.put("b", "yyyy")
+    cache.get("a")
+    cache.put("c", "zzzz")
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.stats()["bytes"] == 8
+    assert cache.evictions == 1
+
+
+def test_value_larger_than_max_bytes_is_not_stored():
+    cache = LRUCache(max_bytes=10)
+    cache.put("small", "xx")
+    cache.put("big", "x" * 11)
+
+    assert "big" not in cache
+    assert cache.get("small") == "xx"
+    assert cache.stats()["bytes"] == 2
+    assert cache.evictions == 0
+
+
+def test_oversized_value_drops_the_old_entry_for_its_key():
+    cache = LRUCache(max_bytes=10)
+    cache.put("key", "old")
+    cache.put("key", "x" * 11)
+    assert cache.get("key") is None
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LRUCache(ttl=10)
+    cache.put("default", 1)
+    cache.put("short", 2, ttl=1)
+
+    clock.now += 1
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 9
+    assert "default" not in cache
+    assert cache.get("default") is None
+    assert cache.expirations == 2
+    assert len(cache) == 0
+
+
+def test_expired_entries_at_the_cold_end_count_as_expirations(clock):
+    cache = LRUCache(max_entries=1, ttl=1)
+    cache.put("a", 1)
+    clock.now += 2
+    cache.put("b", 2)
+    assert cache.expirations == 1
+    assert cache.evictions == 0
+
+
+def test_counters():
+    cache = LRUCache(max_entries=1)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    cache.put("b", 2)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
@@ -0,0 +1,35 @@
+from app.utils.near_duplicates import NearDuplicateIndex, article_text
+
+WIRE_STORY = {
+    "title": "Wildfire forces evacuations near Sacramento as winds pick up - Reuters",
+    "description": "Thousands of residents east of Sacramento were ordered to leave their homes on Tuesday "
+                   "as a fast-moving wildfire spread through dry grassland, fire officials said."
+}
+SYNDICATED_COPY = {
+    "title": "Wildfire forces evacuations near Sacramento as winds pick up | KCRA",
+    "description": "Thousands of residents east of Sacramento were ordered to leave their homes Tuesday "
+                   "as a fast-moving wildfire spread through dry grassland, fire officials said."
+}
+UNRELATED_STORY = {
+    "title": "Warriors beat Lakers in overtime thriller - ESPN",
+    "description": "Stephen Curry scored 41 points as Golden State edged Los Angeles 128-125 after overtime "
+                   "at Chase Center on Tuesday night."
+}
+
+
+def test_syndicated_copies_cluster_and_unrelated_story_does_not():
+    index = NearDuplicateIndex()
+    assert index.find_or_add(article_text(WIRE_STORY), "wire") is None
+    assert index.find_or_add(article_text(SYNDICATED_COPY), "copy") == "wire"
+    assert index.find_or_add(article_text(UNRELATED_STORY), "other") is None
+
+
+def test_outlet_suffix_is_ignored():
+    assert article_text(WIRE_STORY).startswith("Wildfire forces evacuations near Sacramento as winds pick up ")
+    assert "Reuters" not in article_text(WIRE_STORY)
+
+
+def test_empty_texts_never_cluster():
+    index = NearDuplicateIndex()
+    assert index.find_or_add("", "first") is None
+    assert index.find_or_add("", "second") is None
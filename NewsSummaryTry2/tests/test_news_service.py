@@ -0,0 +1,208 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.services.news_service import NewsService
+from app.services.openai_service import OpenAIService
+
+
+def newsapi_articles(count, urls=None, start=0):
+    """Build NewsAPI-shaped articles; ``urls`` limits how many distinct URLs they use"""
+    return [
+        {
+            "title": f"Story {i} in California",
+            "description": f"Description of story {i} in California",
+            "content": "Content " * 20,
+            "url": f"https://news.example/{(i % urls) if urls else i}",
+            "urlToImage": None,
+            "source": {"name": "Example"},
+            "publishedAt": "2025-01-01T00:00:00Z"
+        }
+        for i in range(start, start + count)
+    ]
+
+
+class FakeOpenAI:
+    """OpenAI stand-in that counts its calls and finds every article relevant"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, request):
+        self.calls += 1
+        body = json.loads(request.content)
+        prompt = body["messages"][-1]["content"]
+        if body.get("response_format"):
+            verdict = {"mentions_region": True, "relevance_score": 8, "justification": "Names the region"}
+            if "Articles:\n" in prompt:
+                # Batched call: one entry per article id
+                ids = [item["id"] for item in json.loads(prompt.split("Articles:\n", 1)[1])]
+                content = {"articles": [dict(verdict, id=i, summary=f"Summary {i}.") for i in ids]}
+            else:
+                content = dict(verdict, summary="A summary.")
+            content = json.dumps(content)
+        else:
+            content = "A summary."
+        return httpx.Response(200, json={
+            "id": "test", "object": "chat.completion", "created": 0, "model": "test",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+        })
+
+
+def make_openai_service(fake):
+    client = AsyncOpenAI(api_key="sk-test", max_retries=0,
+                         http_client=httpx.AsyncClient(transport=httpx.MockTransport(fake)))
+    return OpenAIService(client=client)
+
+
+def make_news_service(handler, **kwargs):
+    service = NewsService(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+    service.hedge_delay = 0.05
+    return service
+
+
+def test_fetch_falls_back_when_headlines_shrink_below_ten_after_dedup():
+    # 12 raw headlines but only 5 distinct URLs: enough to skip the hedge by raw count,
+    # too few to serve top-headlines once repeats are dropped
+    async def handler(request):
+        if request.url.path.endswith("top-headlines"):
+            return httpx.Response(200, json={"totalResults": 12, "articles": newsapi_articles(12, urls=5)})
+        return httpx.Response(200, json={"totalResults": 8, "articles": newsapi_articles(8, start=100)})
+
+    service = make_news_service(handler)
+    try:
+        articles, search_queries, _ = asyncio.run(
+            service._fetch_articles({"region": "California", "country_code": "US"})
+        )
+    finally:
+        service.close()
+
+    assert search_queries["used_endpoint"] == "everything"
+    assert len(articles) == 13
+    assert len({article["url"] for article in articles}) == 13
+
+
+def test_irrelevant_articles_are_summarized_without_the_llm():
+    fake = FakeOpenAI()
+
+    async def handler(request):
+        return httpx.Response(500)
+
+    service = make_news_service(handler, openai_service=make_openai_service(fake))
+    article = {
+        "title": "Texas legislature passes budget",
+        "description": "Lawmakers in Austin agreed on spending for the next two years.",
+        "content": "The Texas House and Senate approved the budget late on Friday after weeks of talks.",
+        "url": "https://news.example/texas"
+    }
+    stats = service._new_vetting_stats()
+    try:
+        relevant = asyncio.run(service._vet_article(article, "California", vetting_stats=stats))
+    finally:
+        service.close()
+
+    assert not relevant
+    assert fake.calls == 0
+    assert article["summary_source"] == "extractive"
+    assert article["ai_summary"]
+    assert stats["llm_calls"] == 0
+    assert stats["llm_calls_saved"] == 1
+
+
+def test_second_vetting_pass_makes_no_openai_calls(monkeypatch):
+    monkeypatch.setenv("RELEVANCE_PREFILTER", "0")
+    fake = FakeOpenAI()
+    openai_service = make_openai_service(fake)
+    openai_service.batch_size = 4
+
+    async def handler(request):
+        return httpx.Response(500)
+
+    service = make_news_service(handler, openai_service=openai_service)
+    # Only the in-memory and summary/verdict caches may make the second pass free
+    service.article_store.close()
+    service.article_store = None
+    articles = newsapi_articles(4)
+
+    async def vet_all():
+        batcher = openai_service.batch_classifier("California")
+        try:
+            return await asyncio.gather(*(
+                service._vet_article(dict(article), "California", batcher=batcher) for article in articles
+            ))
+        finally:
+            await batcher.close()
+
+    try:
+        assert asyncio.run(vet_all()) == [True] * 4
+        cold_calls = fake.calls
+        assert asyncio.run(vet_all()) == [True] * 4
+    finally:
+        service.close()
+
+    assert cold_calls == 1
+    assert fake.calls == cold_calls
+
+
+@pytest.mark.parametrize("use_article_store", [True, False])
+def test_second_vetting_pass_in_extractive_mode_makes_no_openai_calls(monkeypatch, use_article_store):
+    monkeypatch.setenv("RELEVANCE_PREFILTER", "0")
+    monkeypatch.setenv("SUMMARY_MODE", "extractive")
+    fake = FakeOpenAI()
+    openai_service = make_openai_service(fake)
+
+    async def handler(request):
+        return httpx.Response(500)
+
+    service = make_news_service(handler, openai_service=openai_service)
+    if not use_article_store:
+        service.article_store.close()
+        service.article_store = None
+    articles = [NewsService._normalize_article(article) for article in newsapi_articles(4)]
+
+    async def vet_all(stats):
+        return await asyncio.gather(*(
+            service._vet_article(dict(article), "California", vetting_stats=stats) for article in articles
+        ))
+
+    cold_stats = service._new_vetting_stats()
+    warm_stats = service._new_vetting_stats()
+    try:
+        assert asyncio.run(vet_all(cold_stats)) == [True] * 4
+        cold_calls = fake.calls
+        if use_article_store:
+            # Only the article store may make the second pass free
+            service.verdict_cache.clear()
+            service.verdict_store.close()
+            service.verdict_store = None
+        assert asyncio.run(vet_all(warm_stats)) == [True] * 4
+    finally:
+        service.close()
+
+    assert cold_calls == cold_stats["llm_calls"] == 4
+    assert fake.calls == cold_calls
+    assert warm_stats["llm_calls"] == 0
+    assert warm_stats["from_store"] == (4 if use_article_store else 0)
+    # Reused verdicts are not pre-filter savings
+    assert warm_stats["llm_calls_saved"] == 0
+
+
+def test_verdict_cache_keys_change_with_the_prefilter(monkeypatch):
+    async def handler(request):
+        return httpx.Response(500)
+
+    keys = []
+    for setting in ("1", "0"):
+        monkeypatch.setenv("RELEVANCE_PREFILTER", setting)
+        service = make_news_service(handler)
+        try:
+            keys.append(service._verdict_key("hash", "California"))
+            assert keys[-1].endswith(service.verdict_version)
+        finally:
+            service.close()
+
+    assert keys[0] != keys[1]
@@ -0,0 +1,48 @@
+import pytest
+
+from app.utils.relevance_prefilter import RelevancePrefilter, RELEVANT, IRRELEVANT, UNCERTAIN
+
+
+@pytest.fixture(scope="module")
+def prefilter():
+    return RelevancePrefilter(low=0.0, high=0.9)
+
+
+@pytest.mark.parametrize("region, article", [
+    ("Alabama", {"title": "Apple unveils new mobile chip", "description": "The Mobile chip is faster"}),
+    ("New York", {"title": "Buffalo wings, ranked", "description": "Buffalo sauce recipes for game day"}),
+    ("Nebraska", {"title": "Lincoln biopic premieres", "description": "A new film about Lincoln opens"}),
+    ("Washington", {"title": "Washington agrees budget deal", "description": "Congress in Washington voted"}),
+])
+def test_city_names_alone_never_settle_relevance(prefilter, region, article):
+    verdict, confidence, _ = prefilter.classify(article, region)
+    assert verdict == UNCERTAIN
+    assert confidence < prefilter.high
+
+
+def test_cities_match_case_sensitively(prefilter):
+    verdict, _, matched = prefilter.classify(
+        {"title": "Apple unveils new mobile chip", "description": "A faster mobile processor"}, "Alabama"
+    )
+    assert verdict == IRRELEVANT
+    assert matched == []
+
+
+def test_region_name_with_city_is_relevant(prefilter):
+    verdict, _, matched = prefilter.classify(
+        {"title": "California wildfire grows", "description": "Evacuations ordered near Los Angeles"}, "California"
+    )
+    assert verdict == RELEVANT
+    assert matched == ["California", "Los Angeles"]
+
+
+def test_distinctive_alias_is_strong(prefilter):
+    verdict, _, _ = prefilter.classify(
+        {"title": "Washington state wildfire", "description": "Fires in Washington State spread"}, "Washington"
+    )
+    assert verdict == RELEVANT
+
+
+def test_version_changes_with_the_thresholds(prefilter):
+    assert RelevancePrefilter(low=0.0, high=0.9).version == prefilter.version
+    assert RelevancePrefilter(low=0.0, high=0.8).version != prefilter.version
@@ -0,0 +1,224 @@
+import asyncio
+import email.utils
+
+import httpx
+import pytest
+
+from app.utils import resilience
+from app.utils.resilience import (
+    CircuitBreaker, TokenBucket, UpstreamPolicy, UpstreamUnavailable, parse_retry_after
+)
+
+
+class FakeClock:
+    """Stands in for ``time`` and ``asyncio.sleep``; sleeping advances the clock instantly"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    monkeypatch.setattr(resilience.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+async def _return(value):
+    return value
+
+
+def response(status_code, **headers):
+    return httpx.Response(status_code, headers=headers, request=httpx.Request("GET", "https://upstream.example"))
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow()
+    assert breaker.retry_in() == 30
+
+
+def test_half_open_breaker_admits_one_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.advance(29.9)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.advance(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A cancelled probe frees the slot for the next caller
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+    breaker.trip()
+    clock.advance(10)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened == 2
+    assert breaker.retry_in() == 10
+
+
+def test_token_bucket_allows_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+
+    async def take(count, max_wait=None):
+        return [await bucket.acquire(max_wait) for _ in range(count)]
+
+    assert asyncio.run(take(3)) == [True] * 3
+    assert clock.sleeps == []
+
+    assert asyncio.run(take(2)) == [True, True]
+    assert clock.sleeps == [0.5, 0.5]
+
+    clock.advance(10)
+    assert asyncio.run(take(3)) == [True] * 3
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_token_bucket_refuses_when_the_wait_is_too_long(clock):
+    bucket = TokenBucket(rate=1, burst=1)
+    assert asyncio.run(bucket.acquire(max_wait=0.5))
+    assert not asyncio.run(bucket.acquire(max_wait=0.5))
+    # The refused call did not use up a token
+    clock.advance(1)
+    assert asyncio.run(bucket.acquire(max_wait=0))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_a_minute = email.utils.formatdate(resilience.time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(in_a_minute) <= 60
+
+
+def test_policy_retries_transient_failures(clock):
+    policy = UpstreamPolicy("test", breaker=CircuitBreaker(failure_threshold=5), max_retries=2)
+    outcomes = [response(503), response(502), response(200)]
+
+    result = asyncio.run(policy.call(lambda: _return(outcomes.pop(0))))
+
+    assert result.status_code == 200
+    assert policy.retries == 2
+    assert len(clock.sleeps) == 2
+    assert policy.breaker.failures == 0
+
+
+def test_policy_returns_client_errors_without_retrying(clock):
+    policy = UpstreamPolicy("test", max_retries=2)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return response(404)
+
+    assert asyncio.run(policy.call(call)).status_code == 404
+    assert len(calls) == 1
+    assert policy.retries == 0
+
+
+def test_policy_gives_up_after_max_retries(clock):
+    policy = UpstreamPolicy("test", breaker=CircuitBreaker(failure_threshold=10), max_retries=2)
+
+    async def call():
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(policy.call(call))
+    assert policy.retries == 2
+    assert policy.breaker.failures == 3
+
+
+def test_short_retry_after_is_a_lower_bound_on_the_backoff(clock):
+    policy = UpstreamPolicy("test", max_retries=1, base_delay=0.2, max_delay=2.0)
+    outcomes = [response(429, **{"Retry-After": "1"}), response(200)]
+
+    assert asyncio.run(policy.call(lambda: _return(outcomes.pop(0)))).status_code == 200
+    assert 1.0 <= clock.sleeps[0] <= 1.2
+
+
+def test_long_retry_after_opens_the_circuit_for_that_long(clock):
+    policy = UpstreamPolicy("test", breaker=CircuitBreaker(failure_threshold=5), max_retries=2, max_delay=2.0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return response(429, **{"Retry-After": "60"})
+
+    assert asyncio.run(policy.call(call)).status_code == 429
+    assert len(calls) == 1
+    assert clock.sleeps == []
+    assert policy.breaker.state == CircuitBreaker.OPEN
+    assert policy.breaker.retry_in() == 60
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(policy.call(call))
+    assert len(calls) == 1
+    assert policy.rejected == 1
+
+    clock.advance(60)
+    assert asyncio.run(policy.call(lambda: _return(response(200)))).status_code == 200
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_policy_refuses_calls_when_the_rate_limit_is_exhausted(clock):
+    breaker = CircuitBreaker(failure_threshold=1)
+    policy = UpstreamPolicy("test", rate_limiter=TokenBucket(rate=1, burst=1), breaker=breaker, max_wait=0.5)
+
+    assert asyncio.run(policy.call(lambda: _return(response(200)))).status_code == 200
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(policy.call(lambda: _return(response(200))))
+    assert policy.rejected == 1
+    # A refusal is not an upstream failure
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limit_refusal_frees_the_half_open_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    bucket = TokenBucket(rate=1, burst=1)
+    policy = UpstreamPolicy("test", rate_limiter=bucket, breaker=breaker, max_wait=0)
+    breaker.trip()
+    clock.advance(5)
+    asyncio.run(bucket.acquire())
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(policy.call(lambda: _return(response(200))))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,146 @@
+import asyncio
+
+from app.utils.single_flight import SingleFlight
+
+
+class Work:
+    """A run that waits until released, counting how often it was started"""
+
+    def __init__(self, result="done", error=None):
+        self.started = 0
+        self.finished = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.started += 1
+        await self.release.wait()
+        self.finished += 1
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def settle():
+    """Let every ready task run until it blocks"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_callers_share_one_run():
+    async def main():
+        flight = SingleFlight()
+        work = Work()
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+        await settle()
+        assert flight.in_flight("key")
+        work.release.set()
+        results = await asyncio.gather(*waiters)
+        return flight, work, results
+
+    flight, work, results = asyncio.run(main())
+    assert results == ["done"] * 3
+    assert work.started == 1
+    assert not flight.in_flight("key")
+
+
+def test_errors_reach_every_waiter_and_the_next_call_runs_again():
+    async def main():
+        flight = SingleFlight()
+        work = Work(error=ValueError("upstream failed"))
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await settle()
+        work.release.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        work.error = None
+        retry = await flight.do("key", work)
+        return work, outcomes, retry
+
+    work, outcomes, retry = asyncio.run(main())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert retry == "done"
+    assert work.started == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_run():
+    async def main():
+        flight = SingleFlight()
+        work = Work()
+        leaving = asyncio.create_task(flight.do("key", work))
+        staying = asyncio.create_task(flight.do("key", work))
+        await settle()
+        leaving.cancel()
+        await settle()
+        work.release.set()
+        return leaving, await staying, work
+
+    leaving, result, work = asyncio.run(main())
+    assert leaving.cancelled()
+    assert result == "done"
+    assert work.finished == 1
+
+
+def test_run_finishes_after_every_waiter_left():
+    async def main():
+        flight = SingleFlight()
+        work = Work()
+        waiter = asyncio.create_task(flight.do("key", work))
+        await settle()
+        waiter.cancel()
+        await settle()
+        # Nobody is waiting, but the run (e.g. a feed build that fills the cache) carries on
+        assert flight.in_flight("key")
+        work.release.set()
+        await settle()
+        return flight, work
+
+    flight, work = asyncio.run(main())
+    assert work.finished == 1
+    assert not flight.in_flight("key")
+
+
+def test_cancelling_the_run_cancels_every_waiter():
+    async def main():
+        flight = SingleFlight()
+        work = Work()
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await settle()
+        flight.start("key", work).cancel()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        return flight, work, outcomes
+
+    flight, work, outcomes = asyncio.run(main())
+    assert all(isinstance(outcome, asyncio.CancelledError) for outcome in outcomes)
+    assert work.started == 1
+    assert work.finished == 0
+    assert len(flight) == 0
+
+
+def test_cancel_all_stops_runs_in_flight():
+    async def main():
+        flight = SingleFlight()
+        works = [Work(), Work()]
+        tasks = [flight.start(key, work) for key, work in enumerate(works)]
+        await settle()
+        await flight.cancel_all()
+        return flight, tasks
+
+    flight, tasks = asyncio.run(main())
+    assert all(task.cancelled() for task in tasks)
+    assert len(flight) == 0
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flight = SingleFlight()
+        work = Work()
+        first = asyncio.create_task(flight.do("a", work))
+        second = asyncio.create_task(flight.do("b", work))
+        await settle()
+        work.release.set()
+        return await asyncio.gather(first, second), work
+
+    results, work = asyncio.run(main())
+    assert results == ["done", "done"]
+    assert work.started == 2